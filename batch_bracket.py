@@ -0,0 +1,291 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from batch_match import get_numpy_generator, simulate_matches
+from bracket import BracketConfig, BracketResult, RoundData, TieScore
+from knockout_tie import (
+    KnockoutTieConfig, KnockoutTieResult, TeamTieData, TieGoal
+)
+from match import MatchConfig
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import LineWriter, TableFormat
+from simulation import Retention, Simulation, SimulationResult
+from team import Team, TeamState
+
+
+@dataclass
+class BatchTieData:
+    team1_ids: np.ndarray
+    team2_ids: np.ndarray
+    team1_goals: np.ndarray
+    team2_goals: np.ndarray
+    team1_elos_before: np.ndarray
+    team2_elos_before: np.ndarray
+    team1_elos_after: np.ndarray
+    team2_elos_after: np.ndarray
+    team1_won: np.ndarray
+
+
+@dataclass
+class BatchRoundData:
+    bye_ids: np.ndarray
+    winner_ids: np.ndarray
+    loser_ids: np.ndarray
+    winner_goals: np.ndarray
+    loser_goals: np.ndarray
+    tie_data: Optional[BatchTieData] = None
+
+
+def build_tie_results(
+        teams: list[Team], tie_data: BatchTieData
+) -> list[KnockoutTieResult]:
+    tie_results: list[KnockoutTieResult] = []
+    legs = tie_data.team1_goals.shape[0]
+
+    for i in range(len(tie_data.team1_ids)):
+        team1 = teams[tie_data.team1_ids[i]]
+        team2 = teams[tie_data.team2_ids[i]]
+
+        team1_data = TeamTieData(int(tie_data.team1_goals[:, i].sum()))
+        team2_data = TeamTieData(int(tie_data.team2_goals[:, i].sum()))
+
+        for leg in range(legs):
+            team1_away = leg % 2 == 1
+            team1_goals = int(tie_data.team1_goals[leg, i])
+            team2_goals = int(tie_data.team2_goals[leg, i])
+
+            team1_data.goal_list.append(TieGoal(team1_goals, team1_away))
+            team2_data.goal_list.append(TieGoal(team2_goals, not team1_away))
+
+        team1_elo_before = float(tie_data.team1_elos_before[i])
+        team2_elo_before = float(tie_data.team2_elos_before[i])
+
+        team1_state = TeamState(
+            team1,
+            team1_elo_before,
+            float(tie_data.team1_elos_after[i]) - team1_elo_before
+        )
+        team2_state = TeamState(
+            team2,
+            team2_elo_before,
+            float(tie_data.team2_elos_after[i]) - team2_elo_before
+        )
+
+        if tie_data.team1_won[i]:
+            tie_results.append(KnockoutTieResult(
+                team1_state, team2_state, team1_data, team2_data
+            ))
+
+        else:
+            tie_results.append(KnockoutTieResult(
+                team2_state, team1_state, team2_data, team1_data
+            ))
+
+    return tie_results
+
+
+def build_tie_scores(
+        teams: list[Team], round_data: BatchRoundData
+) -> list[TieScore]:
+    return [
+        TieScore(
+            teams[winner_id],
+            teams[loser_id],
+            int(winner_goals),
+            int(loser_goals)
+        )
+        for winner_id, loser_id, winner_goals, loser_goals in zip(
+            round_data.winner_ids,
+            round_data.loser_ids,
+            round_data.winner_goals,
+            round_data.loser_goals
+        )
+    ]
+
+
+@dataclass
+class BatchBracketResult(SimulationResult):
+    teams: list[Team]
+    winner_id: int
+    all_round_data: list[BatchRoundData] = field(default_factory=list)
+
+    @property
+    def winner(self) -> Team:
+        return self.teams[self.winner_id]
+
+    def to_bracket_result(self) -> BracketResult:
+        all_round_data: list[RoundData] = []
+
+        for round_data in self.all_round_data:
+            tie_results: list[KnockoutTieResult] = []
+
+            if round_data.tie_data is not None:
+                tie_results = build_tie_results(self.teams, round_data.tie_data)
+
+            all_round_data.append(RoundData(
+                tie_results,
+                [self.teams[i] for i in round_data.bye_ids],
+                [self.teams[i] for i in round_data.loser_ids],
+                build_tie_scores(self.teams, round_data)
+            ))
+
+        return BracketResult(self.winner, all_round_data)
+
+    def display(
+            self,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        return self.to_bracket_result().display(
+            show_elo=show_elo, table_format=table_format
+        )
+
+    def render(
+            self,
+            writer: LineWriter,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> None:
+        self.to_bracket_result().render(
+            writer, show_elo=show_elo, table_format=table_format
+        )
+
+
+@dataclass
+class BatchBracket(Simulation):
+    teams: list[Team] = field(default_factory=list)
+    match_config: MatchConfig = MatchConfig()
+    tie_config: KnockoutTieConfig = KnockoutTieConfig()
+    bracket_config: BracketConfig = BracketConfig()
+    retention: Retention = Retention.FULL
+
+    def get_teams(self) -> list[Team]:
+        return self.teams
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> BatchBracketResult:
+        generator = get_numpy_generator(as_stream(rng))
+        ratings = ratings if ratings is not None else RatingState()
+
+        og_elos = np.array([ratings.get_elo(team) for team in self.teams])
+        elos = og_elos.copy()
+        ids = np.arange(len(self.teams))
+        all_round_data: list[BatchRoundData] = []
+
+        while len(ids) > 1:
+
+            if len(ids) > 2 and self.bracket_config.shuffle_teams:
+                ids = generator.permutation(ids)
+
+            team_count = len(ids)
+
+            if team_count & (team_count - 1):
+                team_count -= (1 << team_count.bit_length()) - len(ids)
+
+            team1_ids, team2_ids = ids[0:team_count:2], ids[1:team_count:2]
+            bye_ids = ids[team_count:]
+
+            team1_elos_before = elos[team1_ids]
+            team2_elos_before = elos[team2_ids]
+
+            team1_won, team1_goals, team2_goals = self.play_ties(
+                team1_ids, team2_ids, elos, generator
+            )
+
+            winner_ids = np.where(team1_won, team1_ids, team2_ids)
+            loser_ids = np.where(team1_won, team2_ids, team1_ids)
+            ids = np.concatenate([winner_ids, bye_ids])
+
+            if self.retention == Retention.WINNER:
+                continue
+
+            team1_goal_totals = team1_goals.sum(axis=0)
+            team2_goal_totals = team2_goals.sum(axis=0)
+            tie_data: Optional[BatchTieData] = None
+
+            if self.retention == Retention.FULL:
+                tie_data = BatchTieData(
+                    team1_ids,
+                    team2_ids,
+                    team1_goals,
+                    team2_goals,
+                    team1_elos_before,
+                    team2_elos_before,
+                    elos[team1_ids],
+                    elos[team2_ids],
+                    team1_won
+                )
+
+            all_round_data.append(BatchRoundData(
+                bye_ids,
+                winner_ids,
+                loser_ids,
+                np.where(team1_won, team1_goal_totals, team2_goal_totals),
+                np.where(team1_won, team2_goal_totals, team1_goal_totals),
+                tie_data
+            ))
+
+        if self.match_config.dynamic_elo:
+
+            for team, og_elo, elo in zip(self.teams, og_elos, elos):
+                ratings.add_elo(team, float(elo - og_elo))
+
+        return BatchBracketResult(self.teams, int(ids[0]), all_round_data)
+
+    def play_ties(
+            self,
+            team1_ids: np.ndarray,
+            team2_ids: np.ndarray,
+            elos: np.ndarray,
+            generator: np.random.Generator
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        legs = self.tie_config.legs
+        team1_goals = np.zeros((legs, len(team1_ids)), dtype=np.int64)
+        team2_goals = np.zeros((legs, len(team1_ids)), dtype=np.int64)
+        team1_away_goals = np.zeros(len(team1_ids), dtype=np.int64)
+        team2_away_goals = np.zeros(len(team1_ids), dtype=np.int64)
+
+        for leg in range(legs):
+
+            if leg % 2 == 0:
+                home_ids, away_ids = team1_ids, team2_ids
+
+            else:
+                home_ids, away_ids = team2_ids, team1_ids
+
+            result = simulate_matches(
+                elos[home_ids], elos[away_ids], self.match_config, generator
+            )
+
+            if leg % 2 == 0:
+                team1_goals[leg] = result.home_goals
+                team2_goals[leg] = result.away_goals
+                team2_away_goals += result.away_goals
+
+            else:
+                team2_goals[leg] = result.home_goals
+                team1_goals[leg] = result.away_goals
+                team1_away_goals += result.away_goals
+
+            if self.match_config.dynamic_elo:
+                elos[home_ids] += result.home_elo_gains
+                elos[away_ids] -= result.home_elo_gains
+
+        goal_diffs = team1_goals.sum(axis=0) - team2_goals.sum(axis=0)
+        team1_won = generator.random(len(team1_ids)) < 0.5
+
+        if self.tie_config.decides_on_away_goals:
+            away_goal_diffs = team1_away_goals - team2_away_goals
+            team1_won = np.where(
+                away_goal_diffs != 0, away_goal_diffs > 0, team1_won
+            )
+
+        team1_won = np.where(goal_diffs != 0, goal_diffs > 0, team1_won)
+
+        return team1_won, team1_goals, team2_goals
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from match import MatchConfig
+from random_stream import RandomStream
+
+HOME_WIN = 1
+DRAW = 0
+AWAY_WIN = -1
+
+
+@dataclass
+class BatchMatchResult:
+    home_goals: np.ndarray
+    away_goals: np.ndarray
+    home_elo_gains: np.ndarray
+    outcomes: np.ndarray
+
+
+@dataclass
+class BatchRoundsResult:
+    home_goals: np.ndarray
+    away_goals: np.ndarray
+    home_elo_gains: np.ndarray
+    outcomes: np.ndarray
+    final_elos: np.ndarray
+
+
+def get_numpy_generator(stream: RandomStream) -> np.random.Generator:
+    if stream.is_numpy:
+        return stream.generator
+
+    return np.random.default_rng(stream.generator.getrandbits(128))
+
+
+def get_home_win_chances(
+        home_elos: np.ndarray, away_elos: np.ndarray, match_config: MatchConfig
+) -> np.ndarray:
+    elo_diff = away_elos - home_elos - match_config.home_advantage
+    weighted_elo_diff = elo_diff / match_config.elo_weight
+    return 1 / (10 ** weighted_elo_diff + 1)
+
+
+def simulate_matches(
+        home_elos: np.ndarray,
+        away_elos: np.ndarray,
+        match_config: MatchConfig = MatchConfig(),
+        rng: Optional[np.random.Generator] = None
+) -> BatchMatchResult:
+    rng = rng if rng is not None else np.random.default_rng()
+
+    home_elos = np.asarray(home_elos, dtype=np.float64)
+    away_elos = np.asarray(away_elos, dtype=np.float64)
+    home_win_chances = get_home_win_chances(home_elos, away_elos, match_config)
+
+    seconds = int(match_config.match_minutes * 60)
+    minutes = match_config.match_minutes
+    goals_per_sec = match_config.goals_per_game / minutes / 60
+
+    goals = rng.binomial(seconds, goals_per_sec, size=home_elos.shape)
+    home_goals = rng.binomial(goals, home_win_chances)
+    away_goals = goals - home_goals
+
+    outcomes = np.sign(home_goals - away_goals).astype(np.int8)
+
+    if match_config.dynamic_elo:
+        result = (outcomes == HOME_WIN).astype(np.float64)
+        home_elo_gains = match_config.elo_con_var_idx * (
+            result - home_win_chances
+        )
+
+    else:
+        home_elo_gains = np.zeros(home_elos.shape)
+
+    return BatchMatchResult(home_goals, away_goals, home_elo_gains, outcomes)
+
+
+def simulate_rounds(
+        elos: np.ndarray,
+        home_ids: np.ndarray,
+        away_ids: np.ndarray,
+        match_config: MatchConfig = MatchConfig(),
+        rng: Optional[np.random.Generator] = None
+) -> BatchRoundsResult:
+    rng = rng if rng is not None else np.random.default_rng()
+
+    elos = np.array(elos, dtype=np.float64)
+    home_ids = np.atleast_2d(home_ids)
+    away_ids = np.atleast_2d(away_ids)
+
+    shape = home_ids.shape
+    home_goals = np.empty(shape, dtype=np.int64)
+    away_goals = np.empty(shape, dtype=np.int64)
+    home_elo_gains = np.empty(shape, dtype=np.float64)
+    outcomes = np.empty(shape, dtype=np.int8)
+
+    for i in range(shape[0]):
+        result = simulate_matches(
+            elos[home_ids[i]], elos[away_ids[i]], match_config, rng
+        )
+
+        home_goals[i] = result.home_goals
+        away_goals[i] = result.away_goals
+        home_elo_gains[i] = result.home_elo_gains
+        outcomes[i] = result.outcomes
+
+        if match_config.dynamic_elo:
+            np.add.at(elos, home_ids[i], result.home_elo_gains)
+            np.subtract.at(elos, away_ids[i], result.home_elo_gains)
+
+    return BatchRoundsResult(
+        home_goals, away_goals, home_elo_gains, outcomes, elos
+    )
@@ -0,0 +1,310 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Callable, Optional
+
+from batch_bracket import BatchBracket
+from bracket import Bracket
+from group_tournament import GroupConfig, GroupTournament
+from knockout_tie import KnockoutTie
+from league import League
+from match import Match, MatchConfig, MatchEngine
+from reader import read_teams_from_csv
+from team import Team, TeamTable
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+TEAM_PATH = os.path.join(BENCHMARK_DIR, "teams.csv")
+SEED = 20240101
+DEFAULT_THRESHOLD = 0.1
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    unit: str
+    units: int
+    run: Callable[[random.Random], Any]
+    repeats: int = 3
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    unit: str
+    units: int
+    repeats: int
+    best_seconds: float
+    mean_seconds: float
+    units_per_second: float
+    peak_memory: int
+    retained_blocks: int = 0
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else 0
+
+    def display(self) -> str:
+        return (
+            f"{self.name}: {self.metric} {self.baseline:.6g} -> "
+            f"{self.current:.6g} ({100 * self.change:+.1f}%)"
+        )
+
+
+def create_synthetic_teams(count: int, seed: int = SEED) -> list[Team]:
+    rng = random.Random(seed)
+    table = TeamTable()
+
+    for i in range(count):
+        table.add_team(f"Team {i}", "Synthetic", rng.gauss(1500, 200), 1)
+
+    return table.get_teams()
+
+
+def play_matches(
+        home_team: Team, away_team: Team, match_config: MatchConfig, count: int
+) -> Callable[[random.Random], Any]:
+    match = Match(home_team, away_team, match_config)
+
+    def run(rng: random.Random) -> None:
+        for _ in range(count):
+            match.simulate(rng)
+
+    return run
+
+
+def play_ties(teams: list[Team], count: int) -> Callable[[random.Random], Any]:
+    knockout_tie = KnockoutTie(teams[0], teams[1])
+
+    def run(rng: random.Random) -> None:
+        for _ in range(count):
+            knockout_tie.simulate(rng)
+
+    return run
+
+
+def get_benchmark_cases(teams: list[Team]) -> list[BenchmarkCase]:
+    cases: list[BenchmarkCase] = []
+
+    for engine in MatchEngine:
+        count = 1000 if engine == MatchEngine.PER_SECOND else 20000
+        cases.append(BenchmarkCase(
+            f"match/{engine.value}",
+            "matches",
+            count,
+            play_matches(teams[0], teams[1], MatchConfig(engine=engine), count)
+        ))
+
+    cases.append(BenchmarkCase(
+        "knockout_tie", "ties", 10000, play_ties(teams, 10000)
+    ))
+
+    for team_count in (4, 16, 64, 256, len(teams)):
+        league = League(teams[:team_count])
+        cases.append(BenchmarkCase(
+            f"league/{team_count}",
+            "matches",
+            team_count * (team_count - 1),
+            league.simulate,
+            3 if team_count < 256 else 1
+        ))
+
+    for exponent in (4, 8, 12, 16):
+        bracket_teams = create_synthetic_teams(2 ** exponent)
+        cases.append(BenchmarkCase(
+            f"bracket/{2 ** exponent}",
+            "ties",
+            len(bracket_teams) - 1,
+            Bracket(bracket_teams).simulate,
+            3 if exponent < 16 else 1
+        ))
+        cases.append(BenchmarkCase(
+            f"batch_bracket/{2 ** exponent}",
+            "ties",
+            len(bracket_teams) - 1,
+            BatchBracket(bracket_teams).simulate,
+            3 if exponent < 16 else 1
+        ))
+
+    group_tournament = GroupTournament(
+        teams, group_config=GroupConfig(group_size=16, advancing_per_group=4)
+    )
+    cases.append(BenchmarkCase(
+        "group_tournament/teams.csv",
+        "tournaments",
+        1,
+        group_tournament.simulate
+    ))
+
+    return cases
+
+
+def measure_case(case: BenchmarkCase, seed: int = SEED) -> BenchmarkResult:
+    case.run(random.Random(seed))
+    durations: list[float] = []
+
+    for _ in range(case.repeats):
+        gc.collect()
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        case.run(rng)
+        durations.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = case.run(random.Random(seed))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    retained_blocks = sum(
+        stat.count_diff for stat in after.compare_to(before, "filename")
+    )
+    best_seconds = min(durations)
+
+    return BenchmarkResult(
+        case.name,
+        case.unit,
+        case.units,
+        case.repeats,
+        best_seconds,
+        sum(durations) / len(durations),
+        case.units / best_seconds,
+        peak_memory,
+        retained_blocks
+    )
+
+
+def run_benchmarks(
+        name_filter: Optional[str] = None, seed: int = SEED
+) -> list[BenchmarkResult]:
+    teams = read_teams_from_csv(TEAM_PATH)
+    teams.sort(key=lambda team: team.elo, reverse=True)
+    results: list[BenchmarkResult] = []
+
+    for case in get_benchmark_cases(teams):
+
+        if name_filter is not None and name_filter not in case.name:
+            continue
+
+        result = measure_case(case, seed)
+        results.append(result)
+
+        print(
+            f"{result.name:<28} {result.units_per_second:>14,.1f} "
+            f"{result.unit}/s {result.peak_memory / 1024:>12,.1f} KiB peak",
+            file=sys.stderr
+        )
+
+    return results
+
+
+def find_regressions(
+        results: list[BenchmarkResult],
+        baseline: list[BenchmarkResult],
+        threshold: float = DEFAULT_THRESHOLD
+) -> list[Regression]:
+    baseline_by_name = {result.name: result for result in baseline}
+    regressions: list[Regression] = []
+
+    for result in results:
+        baseline_result = baseline_by_name.get(result.name)
+
+        if baseline_result is None:
+            continue
+
+        if result.units_per_second < (
+                baseline_result.units_per_second * (1 - threshold)
+        ):
+            regressions.append(Regression(
+                result.name,
+                "units_per_second",
+                baseline_result.units_per_second,
+                result.units_per_second
+            ))
+
+        if result.peak_memory > baseline_result.peak_memory * (1 + threshold):
+            regressions.append(Regression(
+                result.name,
+                "peak_memory",
+                baseline_result.peak_memory,
+                result.peak_memory
+            ))
+
+    return regressions
+
+
+def dump_results(results: list[BenchmarkResult], seed: int) -> str:
+    return json.dumps({
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": [asdict(result) for result in results]
+    }, indent=2)
+
+
+def load_results(path: str) -> list[BenchmarkResult]:
+    names = {result_field.name for result_field in fields(BenchmarkResult)}
+
+    with open(path) as results_file:
+        return [
+            BenchmarkResult(**{
+                name: value for name, value in result.items() if name in names
+            })
+            for result in json.load(results_file)["results"]
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulation benchmarks")
+    parser.add_argument("--filter", help="only run cases containing this")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="write JSON results to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="allowed relative slowdown or memory growth"
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.seed)
+    output = dump_results(results, args.seed)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+
+    else:
+        print(output)
+
+    if args.baseline:
+        regressions = find_regressions(
+            results, load_results(args.baseline), args.threshold
+        )
+
+        for regression in regressions:
+            print(f"REGRESSION {regression.display()}", file=sys.stderr)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,56 @@
 import math
-import random
 from dataclasses import dataclass, field
+from typing import Iterable, Optional
 
+from instrumentation import add_count, time_stage
 from knockout_tie import KnockoutTie, KnockoutTieResult, KnockoutTieConfig
 from match import MatchConfig
-from simulation import Simulation, SimulationResult
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import LineWriter, TableFormat, render_to_string
+from simulation import (
+    EventStream, Retention, Simulation, SimulationEvent, SimulationResult,
+    run_events
+)
 from team import Team
 
 
+@dataclass
+class TieScore:
+    winner: Team
+    loser: Team
+    winner_goals: int
+    loser_goals: int
+
+
+def get_tie_score(
+        knockout_tie: KnockoutTie,
+        winner: Team,
+        loser: Team,
+        team1_goals: list[int],
+        team2_goals: list[int]
+) -> TieScore:
+    if winner == knockout_tie.team1:
+        return TieScore(winner, loser, sum(team1_goals), sum(team2_goals))
+
+    return TieScore(winner, loser, sum(team2_goals), sum(team1_goals))
+
+
+def get_result_score(tie_result: KnockoutTieResult) -> TieScore:
+    return TieScore(
+        tie_result.winning_state.team,
+        tie_result.losing_state.team,
+        tie_result.winning_data.total_goals,
+        tie_result.losing_data.total_goals
+    )
+
+
 @dataclass
 class RoundData:
     tie_results: list[KnockoutTieResult] = field(default_factory=list)
     teams_with_bye: list[Team] = field(default_factory=list)
+    losers: list[Team] = field(default_factory=list)
+    tie_scores: list[TieScore] = field(default_factory=list)
 
 
 @dataclass
@@ -19,35 +58,103 @@ class BracketResult(SimulationResult):
     winner: Team
     all_round_data: list[RoundData] = field(default_factory=list)
 
-    def display(self, show_elo: bool = False) -> str:
-        display: list[str] = []
+    def display(
+            self,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        return render_to_string(
+            self.render, show_elo=show_elo, table_format=table_format
+        )
+
+    def render(
+            self,
+            writer: LineWriter,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> None:
+
+        if not self.all_round_data:
+            writer.write_line("")
 
         for i, round_data in enumerate(self.all_round_data):
             inactive_team_count = len(round_data.teams_with_bye)
-            total_ties = len(round_data.tie_results) + inactive_team_count
+            total_ties = len(round_data.losers) + inactive_team_count
 
             if total_ties == 1:
-                display.append("FINAL")
+                writer.write_line("FINAL")
 
             elif total_ties == 2:
-                display.append("SEMI-FINALS")
+                writer.write_line("SEMI-FINALS")
 
             elif total_ties == 4:
-                display.append("QUARTER-FINALS")
+                writer.write_line("QUARTER-FINALS")
 
             else:
-                display.append(f"ROUND OF {2 * total_ties}")
+                writer.write_line(f"ROUND OF {2 * total_ties}")
 
             if round_data.teams_with_bye:
                 names: list[str] = [t.name for t in round_data.teams_with_bye]
-                display.append(f"{len(names)} Byes: {', '.join(names)}")
+                writer.write_line(f"{len(names)} Byes: {', '.join(names)}")
 
             for tie_result in round_data.tie_results:
-                display.append(tie_result.display(show_elo=show_elo))
+                tie_result.render(
+                    writer, show_elo=show_elo, table_format=table_format
+                )
+
+            writer.write_line("")
 
-            display.append("")
 
-        return "\n".join(display)
+@dataclass
+class TieEvent(SimulationEvent):
+    round: int
+    result: KnockoutTieResult
+
+
+@dataclass
+class RoundEvent(SimulationEvent):
+    round: int
+    teams_with_bye: list[Team]
+    losers: list[Team]
+
+
+@dataclass
+class BracketEvent(SimulationEvent):
+    winner: Team
+    retention: Retention = Retention.FULL
+
+
+def fold_bracket_events(events: Iterable[SimulationEvent]) -> BracketResult:
+    all_round_data: list[RoundData] = []
+    tie_results: list[KnockoutTieResult] = []
+
+    for event in events:
+
+        if isinstance(event, TieEvent):
+            tie_results.append(event.result)
+
+        elif isinstance(event, RoundEvent):
+            all_round_data.append(RoundData(
+                tie_results,
+                event.teams_with_bye,
+                event.losers,
+                [get_result_score(tie_result) for tie_result in tie_results]
+            ))
+            tie_results = []
+
+        elif isinstance(event, BracketEvent):
+
+            if event.retention == Retention.WINNER:
+                return BracketResult(event.winner)
+
+            if event.retention == Retention.STANDINGS:
+
+                for round_data in all_round_data:
+                    round_data.tie_results = []
+
+            return BracketResult(event.winner, all_round_data)
+
+    raise ValueError("Event stream ended before the bracket finished")
 
 
 @dataclass
@@ -64,17 +171,40 @@ class Bracket(Simulation):
     match_config: MatchConfig = MatchConfig()
     tie_config: KnockoutTieConfig = KnockoutTieConfig()
     bracket_config: BracketConfig = BracketConfig()
+    retention: Retention = Retention.FULL
+
+    def get_teams(self) -> list[Team]:
+        return self.teams
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> BracketResult:
+        return run_events(self.run(rng, ratings))
+
+    def run(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None,
+            emit_events: bool = False
+    ) -> EventStream:
+        stream = as_stream(rng)
+        ratings = ratings if ratings is not None else RatingState()
 
-    def simulate(self) -> BracketResult:
         teams: list[Team] = [team for team in self.teams]
         all_round_data: list[RoundData] = []
+        retain_ties = self.retention == Retention.FULL
+        build_ties = retain_ties or emit_events
+        round_index = 0
 
         while len(teams) > 2:
 
             if self.bracket_config.shuffle_teams:
-                random.shuffle(teams)
+                stream.shuffle(teams)
 
             round_tie_results: list[KnockoutTieResult] = []
+            round_tie_scores: list[TieScore] = []
             losers: list[Team] = []
             teams_with_bye: list[Team] = []
             team_count: int = len(teams)
@@ -84,28 +214,95 @@ class Bracket(Simulation):
                 team_count = len(teams) - bye_count
                 teams_with_bye = teams[team_count:]
 
-            for i in range(1, team_count, 2):
-                team1, team2 = teams[i - 1], teams[i]
+            tie_streams = stream.spawn(team_count // 2)
+            add_count("ties", team_count // 2)
+            add_count("matches", team_count // 2 * self.tie_config.legs)
 
-                knockout_tie = KnockoutTie(
-                    team1,
-                    team2,
-                    self.match_config,
-                    self.tie_config
-                )
+            with time_stage("bracket_round"):
+
+                for i in range(1, team_count, 2):
+                    team1, team2 = teams[i - 1], teams[i]
+
+                    knockout_tie = KnockoutTie(
+                        team1,
+                        team2,
+                        self.match_config,
+                        self.tie_config
+                    )
+
+                    tie_stream = tie_streams[i // 2]
+
+                    with time_stage("knockout_tie"):
+
+                        if build_ties:
+                            tie_result = knockout_tie.simulate(
+                                tie_stream, ratings
+                            )
+                            loser = tie_result.losing_state.team
+                            tie_score = get_result_score(tie_result)
+
+                        else:
+                            tie_score = get_tie_score(
+                                knockout_tie,
+                                *knockout_tie.play(tie_stream, ratings)
+                            )
+                            loser = tie_score.loser
 
-                tie_result = knockout_tie.simulate()
-                round_tie_results.append(tie_result)
-                losers.append(tie_result.losing_state.team)
+                    losers.append(loser)
+                    round_tie_scores.append(tie_score)
+
+                    if retain_ties:
+                        round_tie_results.append(tie_result)
+
+                    if emit_events:
+                        yield TieEvent(round_index, tie_result)
 
             for loser in losers:
                 teams.remove(loser)
 
-            all_round_data.append(RoundData(round_tie_results, teams_with_bye))
+            if emit_events:
+                yield RoundEvent(round_index, teams_with_bye, losers)
+
+            if self.retention != Retention.WINNER:
+                all_round_data.append(RoundData(
+                    round_tie_results, teams_with_bye, losers, round_tie_scores
+                ))
+
+            round_index += 1
 
         final = KnockoutTie(
             teams[0], teams[1], self.match_config, self.tie_config
         )
-        all_round_data.append(RoundData([final.simulate()], []))
+        final_stream = stream.spawn(1)[0]
+        add_count("ties")
+        add_count("matches", self.tie_config.legs)
+
+        with time_stage("knockout_tie"):
+
+            if build_ties:
+                final_result = final.simulate(final_stream, ratings)
+                final_score = get_result_score(final_result)
+
+            else:
+                final_score = get_tie_score(
+                    final, *final.play(final_stream, ratings)
+                )
+
+            winner, loser = final_score.winner, final_score.loser
+
+        if emit_events and build_ties:
+            yield TieEvent(round_index, final_result)
+
+        if emit_events:
+            yield RoundEvent(round_index, [], [loser])
+            yield BracketEvent(winner, self.retention)
+
+        if retain_ties:
+            all_round_data.append(
+                RoundData([final_result], [], [loser], [final_score])
+            )
+
+        elif self.retention == Retention.STANDINGS:
+            all_round_data.append(RoundData([], [], [loser], [final_score]))
 
-        return BracketResult(teams[0], all_round_data)
+        return BracketResult(winner, all_round_data)
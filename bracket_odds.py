@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from bracket import Bracket
+from odds import get_tie_chance
+from renderer import TableFormat, format_table
+from simulation import SimulationResult
+from team import Team
+
+
+@dataclass
+class BracketOdds(SimulationResult):
+    teams: list[Team]
+    round_chances: list[list[float]] = field(default_factory=list)
+
+    def get_win_chance(self, team: Team) -> float:
+        return self.round_chances[-1][self.teams.index(team)]
+
+    def display(
+            self,
+            limit: Optional[int] = None,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        ids = sorted(
+            range(len(self.teams)), key=lambda i: -self.round_chances[-1][i]
+        )
+
+        table: list[list[str]] = []
+
+        for i, team_id in enumerate(ids[:limit]):
+            table.append([f"{i + 1}. {self.teams[team_id].name}"] + [
+                f"{100 * chances[team_id]:.2f}%"
+                for chances in self.round_chances
+            ])
+
+        headers = ["Team"] + [
+            f"R{i + 1}" for i in range(len(self.round_chances) - 1)
+        ] + ["Win"]
+
+        return format_table(table, headers, table_format)
+
+
+def combine_slots(
+        slot1: dict[int, float],
+        slot2: dict[int, float],
+        tie_chances: list[list[float]]
+) -> dict[int, float]:
+    combined: dict[int, float] = {}
+
+    for team1_id, team1_chance in slot1.items():
+
+        for team2_id, team2_chance in slot2.items():
+            meet_chance = team1_chance * team2_chance
+            advance_chance = tie_chances[team1_id][team2_id]
+
+            combined[team1_id] = combined.get(team1_id, 0) + (
+                meet_chance * advance_chance
+            )
+            combined[team2_id] = combined.get(team2_id, 0) + (
+                meet_chance * (1 - advance_chance)
+            )
+
+    return combined
+
+
+def solve_bracket(bracket: Bracket, elo_step: float = 1) -> BracketOdds:
+    if bracket.bracket_config.shuffle_teams:
+        raise ValueError("Bracket odds need a fixed draw (shuffle_teams=False)")
+
+    if bracket.match_config.dynamic_elo:
+        raise ValueError("Bracket odds need static Elo (dynamic_elo=False)")
+
+    teams = bracket.teams
+    team_count = len(teams)
+
+    if team_count < 2:
+        raise ValueError("Bracket odds need at least two teams")
+
+    tie_chances: list[list[float]] = [[0.5] * team_count for _ in teams]
+
+    for i, team1 in enumerate(teams):
+
+        for j, team2 in enumerate(teams):
+
+            if i != j:
+                tie_chances[i][j] = get_tie_chance(
+                    team1.elo,
+                    team2.elo,
+                    bracket.match_config,
+                    bracket.tie_config,
+                    elo_step
+                )
+
+    slots: list[dict[int, float]] = [{i: 1} for i in range(team_count)]
+    round_chances: list[list[float]] = []
+
+    while len(slots) > 1:
+        playing_count = len(slots)
+
+        if playing_count & (playing_count - 1):
+            playing_count -= (1 << playing_count.bit_length()) - len(slots)
+
+        next_slots = [
+            combine_slots(slots[i - 1], slots[i], tie_chances)
+            for i in range(1, playing_count, 2)
+        ]
+        slots = next_slots + slots[playing_count:]
+
+        chances = [0.0] * team_count
+
+        for slot in slots:
+
+            for team_id, chance in slot.items():
+                chances[team_id] += chance
+
+        round_chances.append(chances)
+
+    return BracketOdds(teams, round_chances)
@@ -0,0 +1,274 @@
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from monte_carlo import (
+    MonteCarlo, MonteCarloResult, TeamAggregate, get_chunks, merge_aggregates,
+    prepare_outcome_simulation, simulate_runs
+)
+from random_stream import RandomStream
+from rating_state import RatingState
+from response_cache import write_atomically
+from result_cache import get_cache_key
+from seasons import Seasons, SeasonsResult
+
+RunRange = tuple[int, int]
+
+
+def add_run_range(run_ranges: list[RunRange], start: int, stop: int) -> None:
+    for range_start, range_stop in run_ranges:
+
+        if start < range_stop and range_start < stop:
+            raise ValueError(f"Runs {start}-{stop} are already checkpointed")
+
+    merged: list[RunRange] = []
+
+    for range_start, range_stop in sorted(run_ranges + [(start, stop)]):
+
+        if merged and merged[-1][1] == range_start:
+            merged[-1] = (merged[-1][0], range_stop)
+
+        else:
+            merged.append((range_start, range_stop))
+
+    run_ranges[:] = merged
+
+
+@dataclass
+class MonteCarloCheckpoint:
+    key: str
+    seed: int
+    chunk_size: int
+    run_ranges: list[RunRange] = field(default_factory=list)
+    aggregates: dict[str, TeamAggregate] = field(default_factory=dict)
+
+    @property
+    def runs(self) -> int:
+        return sum(stop - start for start, stop in self.run_ranges)
+
+    def get_missing_ranges(self, start: int, stop: int) -> list[RunRange]:
+        missing_ranges: list[RunRange] = []
+
+        for range_start, range_stop in self.run_ranges:
+
+            if range_start >= stop:
+                break
+
+            if range_stop > start:
+
+                if range_start > start:
+                    missing_ranges.append((start, range_start))
+
+                start = max(start, range_stop)
+
+        if start < stop:
+            missing_ranges.append((start, stop))
+
+        return missing_ranges
+
+    def holds_runs_outside(self, start: int, stop: int) -> bool:
+        return any(
+            range_start < start or range_stop > stop
+            for range_start, range_stop in self.run_ranges
+        )
+
+    def add(
+            self, start: int, stop: int, aggregates: dict[str, TeamAggregate]
+    ) -> None:
+        add_run_range(self.run_ranges, start, stop)
+        merge_aggregates(self.aggregates, aggregates)
+
+    def merge(self, other: "MonteCarloCheckpoint") -> None:
+        if other.key != self.key:
+            raise ValueError("Checkpoints belong to different simulations")
+
+        for start, stop in other.run_ranges:
+            add_run_range(self.run_ranges, start, stop)
+
+        merge_aggregates(self.aggregates, other.aggregates)
+
+    def to_result(self) -> MonteCarloResult:
+        return MonteCarloResult(self.runs, self.aggregates)
+
+
+@dataclass
+class SeasonsCheckpoint:
+    key: str
+    seed: int
+    season: int = 0
+    rng_state: Any = None
+    elos: dict[str, float] = field(default_factory=dict)
+    winners: list[str] = field(default_factory=list)
+
+
+Checkpoint = Union[MonteCarloCheckpoint, SeasonsCheckpoint]
+
+
+def load_checkpoint(path: str) -> Optional[Checkpoint]:
+    try:
+        with open(path, "rb") as checkpoint_file:
+            return pickle.load(checkpoint_file)
+
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    write_atomically(path, pickle.dumps(checkpoint))
+
+
+def merge_checkpoints(paths: list[str]) -> MonteCarloCheckpoint:
+    merged: Optional[MonteCarloCheckpoint] = None
+
+    for path in paths:
+        checkpoint = load_checkpoint(path)
+
+        if not isinstance(checkpoint, MonteCarloCheckpoint):
+            raise ValueError(f"{path} holds no Monte Carlo checkpoint")
+
+        if merged is None:
+            merged = checkpoint
+
+        else:
+            merged.merge(checkpoint)
+
+    if merged is None:
+        raise ValueError("No checkpoints to merge")
+
+    return merged
+
+
+def simulate_monte_carlo(
+        monte_carlo: MonteCarlo, path: str, interval: float = 60
+) -> MonteCarloResult:
+    config = monte_carlo.monte_carlo_config
+    workers = config.workers or os.cpu_count() or 1
+    simulation = prepare_outcome_simulation(
+        monte_carlo.simulation, config.retention
+    )
+    key = get_cache_key(simulation, config.seed)
+
+    checkpoint = load_checkpoint(path)
+
+    if checkpoint is None:
+        checkpoint = MonteCarloCheckpoint(key, config.seed, config.chunk_size)
+
+    elif not isinstance(checkpoint, MonteCarloCheckpoint) or (
+            checkpoint.key != key
+    ):
+        raise ValueError(f"{path} holds a checkpoint of another simulation")
+
+    stop_run = config.first_run + config.runs
+
+    if checkpoint.holds_runs_outside(config.first_run, stop_run):
+        raise ValueError(
+            f"{path} holds runs outside {config.first_run}-{stop_run}"
+        )
+
+    chunks = [
+        missing_range
+        for chunk_start, chunk_stop in get_chunks(
+            config.first_run, stop_run, checkpoint.chunk_size
+        )
+        for missing_range in checkpoint.get_missing_ranges(
+            chunk_start, chunk_stop
+        )
+    ]
+
+    if workers == 1:
+        executor_context = nullcontext()
+
+    else:
+        executor_context = ProcessPoolExecutor(max_workers=workers)
+
+    saved_at = time.monotonic()
+
+    with executor_context as executor:
+
+        if executor is None:
+            chunk_aggregates = (
+                simulate_runs(simulation, config.seed, start, stop)
+                for start, stop in chunks
+            )
+
+        else:
+            chunk_aggregates = executor.map(
+                simulate_runs,
+                [simulation] * len(chunks),
+                [config.seed] * len(chunks),
+                [start for start, _ in chunks],
+                [stop for _, stop in chunks]
+            )
+
+        try:
+
+            for (start, stop), aggregates in zip(chunks, chunk_aggregates):
+                checkpoint.add(start, stop, aggregates)
+
+                if time.monotonic() - saved_at >= interval:
+                    save_checkpoint(path, checkpoint)
+                    saved_at = time.monotonic()
+
+        finally:
+            save_checkpoint(path, checkpoint)
+
+    return checkpoint.to_result()
+
+
+def simulate_seasons(
+        seasons: Seasons, seed: int, path: str, interval: float = 60
+) -> SeasonsResult:
+    key = get_cache_key(seasons, seed)
+    teams = {team.name: team for team in seasons.get_teams()}
+    generator = random.Random(seed)
+
+    checkpoint = load_checkpoint(path)
+
+    if checkpoint is None:
+        checkpoint = SeasonsCheckpoint(key, seed)
+
+    elif not isinstance(checkpoint, SeasonsCheckpoint) or (
+            checkpoint.key != key
+    ):
+        raise ValueError(f"{path} holds a checkpoint of another simulation")
+
+    if checkpoint.rng_state is not None:
+        generator.setstate(checkpoint.rng_state)
+
+    season_simulation = seasons.get_season_simulation()
+    stream = RandomStream(generator)
+    ratings = RatingState({
+        teams[name]: elo for name, elo in checkpoint.elos.items()
+    })
+    seasons_result = SeasonsResult(
+        [teams[name] for name in checkpoint.winners]
+    )
+    saved_at = time.monotonic()
+
+    try:
+
+        for season in range(checkpoint.season, seasons.seasons):
+            seasons.play_season(
+                season_simulation, seasons_result, stream, ratings
+            )
+
+            checkpoint.season = season + 1
+            checkpoint.rng_state = generator.getstate()
+            checkpoint.elos = {
+                team.name: elo for team, elo in ratings.elo_overlay.items()
+            }
+            checkpoint.winners.append(seasons_result.winners[-1].name)
+
+            if time.monotonic() - saved_at >= interval:
+                save_checkpoint(path, checkpoint)
+                saved_at = time.monotonic()
+
+    finally:
+        save_checkpoint(path, checkpoint)
+
+    return seasons.finish(seasons_result, ratings)
@@ -1,11 +1,25 @@
-import random
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
 
-from bracket import BracketResult, Bracket, BracketConfig
+from bracket import (
+    BracketEvent, BracketResult, Bracket, BracketConfig, RoundEvent, TieEvent,
+    fold_bracket_events
+)
+from instrumentation import time_stage
 from knockout_tie import KnockoutTieConfig
-from league import League, LeagueResult, LeagueConfig
+from league import (
+    League, LeagueEvent, LeagueResult, LeagueConfig, MatchEvent, MatchdayEvent,
+    fold_league_events, retain_league_result
+)
 from match import MatchConfig
-from simulation import SimulationResult, Simulation
+from random_stream import RandomSource, RandomStream, as_stream
+from rating_state import RatingState
+from renderer import LineWriter, TableFormat, render_to_string
+from simulation import (
+    EventStream, Retention, SimulationEvent, SimulationResult, Simulation,
+    run_events
+)
 from team import Team
 
 
@@ -23,44 +37,175 @@ class GroupTournamentResult(SimulationResult):
     teams_with_group_bye: list[Team] = field(default_factory=list)
 
     def display(
-            self, show_elo: bool = False, show_group_matches: bool = False
+            self,
+            show_elo: bool = False,
+            show_group_matches: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
     ) -> str:
-        display: list[str] = []
+        return render_to_string(
+            self.render,
+            show_elo=show_elo,
+            show_group_matches=show_group_matches,
+            table_format=table_format
+        )
+
+    def render(
+            self,
+            writer: LineWriter,
+            show_elo: bool = False,
+            show_group_matches: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> None:
 
         if self.teams_with_group_bye:
             names: list[str] = [t.name for t in self.teams_with_group_bye]
-            display.append(f"{len(names)} Byes: {', '.join(names)}")
-            display.append("")
+            writer.write_line(f"{len(names)} Byes: {', '.join(names)}")
+            writer.write_line("")
 
         if show_group_matches:
 
             for i, group_data in enumerate(self.all_group_data):
                 side = "-" * 7
-                display.append(f"{side} GROUP {i + 1} {side}")
+                writer.write_line(f"{side} GROUP {i + 1} {side}")
 
-                display.append("")
+                writer.write_line("")
 
                 for results in group_data.league_result.match_results_per_day:
 
                     for match_result in results:
-                        display.append(match_result.display(show_elo=show_elo))
+                        writer.write_line(
+                            match_result.display(show_elo=show_elo)
+                        )
 
-                    display.append("")
+                    writer.write_line("")
 
-            display.append("")
+            writer.write_line("")
 
         for i, group_data in enumerate(self.all_group_data):
-            display.append(f"GROUP {i + 1}")
+            writer.write_line(f"GROUP {i + 1}")
 
             names: list[str] = [t.name for t in group_data.advancing_teams]
-            display.append(f"Advanced: {', '.join(names)}")
+            writer.write_line(f"Advanced: {', '.join(names)}")
 
-            display.append(group_data.league_result.display(show_elo=show_elo))
-            display.append("")
+            group_data.league_result.render(
+                writer, show_elo=show_elo, table_format=table_format
+            )
+            writer.write_line("")
+
+        self.bracket_result.render(
+            writer, show_elo=show_elo, table_format=table_format
+        )
 
-        display.append(self.bracket_result.display(show_elo=show_elo))
 
-        return "\n".join(display)
+@dataclass
+class GroupEvent(SimulationEvent):
+    group: int
+    advancing_teams: list[Team]
+
+
+@dataclass
+class GroupStageEvent(SimulationEvent):
+    teams_with_group_bye: list[Team]
+
+
+def fold_group_tournament_events(
+        events: Iterable[SimulationEvent]
+) -> GroupTournamentResult:
+    league_events: dict[int, list[SimulationEvent]] = {}
+    bracket_events: list[SimulationEvent] = []
+    all_group_data: list[GroupData] = []
+    teams_with_bye: list[Team] = []
+
+    for event in events:
+
+        if isinstance(event, (MatchEvent, MatchdayEvent, LeagueEvent)):
+            league_events.setdefault(event.group, []).append(event)
+
+        elif isinstance(event, GroupEvent):
+            league_result = fold_league_events(league_events.pop(event.group))
+            all_group_data.append(
+                GroupData(league_result, event.advancing_teams)
+            )
+
+        elif isinstance(event, GroupStageEvent):
+            teams_with_bye = event.teams_with_group_bye
+
+        elif isinstance(event, (TieEvent, RoundEvent)):
+            bracket_events.append(event)
+
+        elif isinstance(event, BracketEvent):
+            bracket_events.append(event)
+            bracket_result = fold_bracket_events(bracket_events)
+
+            if event.retention == Retention.WINNER:
+                all_group_data = []
+
+            return GroupTournamentResult(
+                bracket_result.winner,
+                bracket_result,
+                all_group_data,
+                teams_with_bye
+            )
+
+    raise ValueError("Event stream ended before the tournament finished")
+
+
+def label_group_events(events: EventStream, group: int) -> EventStream:
+    while True:
+
+        try:
+            event = next(events)
+
+        except StopIteration as stop:
+            return stop.value
+
+        event.group = group
+        yield event
+
+
+def get_league_events(
+        league_result: LeagueResult, group: int, retention: Retention
+) -> Iterator[SimulationEvent]:
+
+    for day, match_results in enumerate(league_result.match_results_per_day):
+
+        for match_result in match_results:
+            yield MatchEvent(day, match_result, group)
+
+        yield MatchdayEvent(day, group)
+
+    yield LeagueEvent(
+        league_result.winner, league_result.entries, group, retention
+    )
+
+
+def simulate_group(
+        league: League, stream: RandomStream, ratings: RatingState
+) -> tuple[LeagueResult, RatingState]:
+    return league.simulate(stream, ratings), ratings
+
+
+def simulate_groups_in_parallel(
+        leagues: list[League],
+        streams: list[RandomStream],
+        ratings: RatingState,
+        workers: int
+) -> list[LeagueResult]:
+    group_results: list[LeagueResult] = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        group_outputs = executor.map(
+            simulate_group,
+            leagues,
+            streams,
+            [ratings.get_subset(league.teams) for league in leagues]
+        )
+
+        for result, group_ratings in group_outputs:
+            ratings.update(group_ratings)
+            group_results.append(result)
+
+    return group_results
 
 
 @dataclass
@@ -68,6 +213,7 @@ class GroupConfig:
     group_size: int = 4
     advancing_per_group: int = 2
     shuffle_groups: bool = True
+    workers: int = 1
 
 
 @dataclass
@@ -78,42 +224,126 @@ class GroupTournament(Simulation):
     tie_config: KnockoutTieConfig = KnockoutTieConfig()
     bracket_config: BracketConfig = BracketConfig()
     group_config: GroupConfig = GroupConfig()
-
-    def simulate(self) -> GroupTournamentResult:
+    retention: Retention = Retention.FULL
+
+    def get_teams(self) -> list[Team]:
+        return self.teams
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> GroupTournamentResult:
+        return run_events(self.run(rng, ratings))
+
+    def run(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None,
+            emit_events: bool = False
+    ) -> EventStream:
+        stream = as_stream(rng)
+        ratings = ratings if ratings is not None else RatingState()
+        teams: list[Team] = [team for team in self.teams]
 
         if self.group_config.shuffle_groups:
-            random.shuffle(self.teams)
+            stream.shuffle(teams)
 
         all_group_data: list[GroupData] = []
         advancing_teams: list[Team] = []
-        stop = len(self.teams) - self.group_config.group_size + 1
+        stop = len(teams) - self.group_config.group_size + 1
+        group_starts = range(0, stop, self.group_config.group_size)
+        group_streams = stream.spawn(len(group_starts))
+        bracket_stream = stream.spawn(1)[0]
+        in_parallel = self.group_config.workers > 1
+
+        if self.retention == Retention.FULL:
+            group_retention = Retention.FULL
+
+        else:
+            group_retention = Retention.STANDINGS
+
+        league_retention = group_retention
+
+        if emit_events and in_parallel:
+            league_retention = Retention.FULL
 
-        for i in range(0, stop, self.group_config.group_size):
-            group: list[Team] = self.teams[i:i + self.group_config.group_size]
-            league = League(group, self.match_config, self.league_config)
-            result = league.simulate()
+        leagues: list[League] = []
 
+        for i in group_starts:
+            group: list[Team] = teams[i:i + self.group_config.group_size]
+
+            leagues.append(League(
+                group, self.match_config, self.league_config, league_retention
+            ))
+
+        if in_parallel:
+
+            with time_stage("group_stage"):
+                group_results = simulate_groups_in_parallel(
+                    leagues, group_streams, ratings, self.group_config.workers
+                )
+
+            if emit_events:
+
+                for i, result in enumerate(group_results):
+                    yield from get_league_events(result, i, group_retention)
+
+                group_results = [
+                    retain_league_result(result, group_retention)
+                    for result in group_results
+                ]
+
+        else:
+            group_results = []
+
+            for i, (league, group_stream) in enumerate(
+                    zip(leagues, group_streams)
+            ):
+                league_events = league.run(group_stream, ratings, emit_events)
+
+                with time_stage("group_league"):
+                    result = yield from label_group_events(league_events, i)
+
+                group_results.append(result)
+
+        for i, result in enumerate(group_results):
             current_advancing_teams: list[Team] = []
 
             for entry in result.entries[:self.group_config.advancing_per_group]:
                 current_advancing_teams.append(entry.state.team)
                 advancing_teams.append(entry.state.team)
 
-            all_group_data.append(GroupData(result, current_advancing_teams))
+            if emit_events:
+                yield GroupEvent(i, current_advancing_teams)
 
-        bye_count = len(self.teams) % self.group_config.group_size
-        teams_with_bye: list[Team] = self.teams[len(self.teams) - bye_count:]
+            if self.retention != Retention.WINNER:
+                all_group_data.append(
+                    GroupData(result, current_advancing_teams)
+                )
+
+        bye_count = len(teams) % self.group_config.group_size
+        teams_with_bye: list[Team] = teams[len(teams) - bye_count:]
+
+        if emit_events:
+            yield GroupStageEvent(teams_with_bye)
 
         bracket = Bracket(
             advancing_teams,
             self.match_config,
             self.tie_config,
-            self.bracket_config
+            self.bracket_config,
+            self.retention
         )
 
+        with time_stage("knockout_stage"):
+            bracket_result = yield from bracket.run(
+                bracket_stream, ratings, emit_events
+            )
+
         return GroupTournamentResult(
-            self.teams[0],
-            bracket.simulate(),
+            bracket_result.winner,
+            bracket_result,
             all_group_data,
             teams_with_bye
         )
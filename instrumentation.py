@@ -0,0 +1,259 @@
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ContextManager, Iterator, Optional, TextIO
+from weakref import WeakKeyDictionary
+
+from renderer import TableFormat, format_table
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0
+    allocated_blocks: int = 0
+
+
+@dataclass
+class InstrumentationReport:
+    seconds: float
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def display(
+            self, table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        stage_rows = [
+            [name, stats.calls, f"{stats.seconds:.4f}", stats.allocated_blocks]
+            for name, stats in sorted(
+                self.stages.items(), key=lambda item: -item[1].seconds
+            )
+        ]
+        counter_rows = [
+            [name, count] for name, count in sorted(self.counters.items())
+        ]
+
+        lines = [f"Total: {self.seconds:.4f}s"]
+
+        if stage_rows:
+            headers = ["Stage", "Calls", "Seconds", "Blocks"]
+            lines.append(format_table(stage_rows, headers, table_format))
+
+        if counter_rows:
+            lines.append(
+                format_table(counter_rows, ["Counter", "Count"], table_format)
+            )
+
+        return "\n".join(lines)
+
+
+class InstrumentationSink:
+
+    def start(self) -> None:
+        pass
+
+    def finish(self, report: InstrumentationReport) -> None:
+        pass
+
+
+class LogSink(InstrumentationSink):
+
+    def __init__(
+            self,
+            logger: Optional[logging.Logger] = None,
+            level: int = logging.INFO
+    ) -> None:
+        self.logger = logger or logging.getLogger("simulation")
+        self.level = level
+
+    def finish(self, report: InstrumentationReport) -> None:
+        self.logger.log(self.level, "simulation took %.4fs", report.seconds)
+
+        for name, stats in report.stages.items():
+            self.logger.log(
+                self.level,
+                "stage %s: %d calls, %.4fs, %d blocks",
+                name, stats.calls, stats.seconds, stats.allocated_blocks
+            )
+
+        for name, count in report.counters.items():
+            self.logger.log(self.level, "counter %s: %d", name, count)
+
+
+class JsonSink(InstrumentationSink):
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+
+    def finish(self, report: InstrumentationReport) -> None:
+        output = json.dumps(report.to_dict(), indent=2)
+
+        if self.path is None:
+            print(output, file=sys.stderr)
+            return
+
+        with open(self.path, "w") as report_file:
+            report_file.write(output + "\n")
+
+
+class ProfileSink(InstrumentationSink):
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            sort: str = "cumulative",
+            limit: int = 30,
+            stream: TextIO = sys.stderr
+    ) -> None:
+        self.path = path
+        self.sort = sort
+        self.limit = limit
+        self.stream = stream
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def finish(self, report: InstrumentationReport) -> None:
+        self.profile.disable()
+
+        if self.path is not None:
+            self.profile.dump_stats(self.path)
+            return
+
+        stats = pstats.Stats(self.profile, stream=self.stream)
+        stats.sort_stats(self.sort).print_stats(self.limit)
+
+
+class StageTimer:
+
+    def __init__(self, instrumentation: "Instrumentation", name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start_blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *_: Any) -> None:
+        seconds = time.perf_counter() - self.start
+        blocks = sys.getallocatedblocks() - self.start_blocks
+        self.instrumentation.record_stage(self.name, seconds, blocks)
+
+
+class Instrumentation:
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        self.start = time.perf_counter()
+        self.report: Optional[InstrumentationReport] = None
+
+    def time_stage(self, name: str) -> StageTimer:
+        return StageTimer(self, name)
+
+    def record_stage(self, name: str, seconds: float, blocks: int) -> None:
+        stats = self.stages.get(name)
+
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.allocated_blocks += blocks
+
+    def add_count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count_calls(self, name: str, function: Callable) -> Callable:
+        counters = self.counters
+
+        def counted(*args: Any) -> Any:
+            counters[name] = counters.get(name, 0) + 1
+            return function(*args)
+
+        return counted
+
+    def finish(self) -> InstrumentationReport:
+        self.report = InstrumentationReport(
+            time.perf_counter() - self.start,
+            dict(self.stages),
+            dict(self.counters)
+        )
+
+        return self.report
+
+
+ACTIVE_INSTRUMENTATION: Optional[Instrumentation] = None
+NULL_STAGE = nullcontext()
+COUNTED_CALLS: "WeakKeyDictionary[Any, dict[str, tuple[str, Callable]]]" = (
+    WeakKeyDictionary()
+)
+
+
+def time_stage(name: str) -> ContextManager:
+    if ACTIVE_INSTRUMENTATION is None:
+        return NULL_STAGE
+
+    return ACTIVE_INSTRUMENTATION.time_stage(name)
+
+
+def add_count(name: str, amount: int = 1) -> None:
+    if ACTIVE_INSTRUMENTATION is not None:
+        ACTIVE_INSTRUMENTATION.add_count(name, amount)
+
+
+def count_calls(name: str, owner: Any, attribute: str) -> None:
+    if ACTIVE_INSTRUMENTATION is None:
+        return
+
+    owner_calls = COUNTED_CALLS.setdefault(owner, {})
+
+    if attribute not in owner_calls:
+        function = getattr(owner, attribute)
+        owner_calls[attribute] = (name, function)
+        setattr(
+            owner, attribute, ACTIVE_INSTRUMENTATION.count_calls(name, function)
+        )
+
+
+def wrap_counted_calls(instrumentation: Optional[Instrumentation]) -> None:
+    for owner, attributes in list(COUNTED_CALLS.items()):
+
+        for attribute, (name, function) in attributes.items():
+
+            if instrumentation is not None:
+                function = instrumentation.count_calls(name, function)
+
+            setattr(owner, attribute, function)
+
+
+@contextmanager
+def instrument(*sinks: InstrumentationSink) -> Iterator[Instrumentation]:
+    global ACTIVE_INSTRUMENTATION
+
+    previous = ACTIVE_INSTRUMENTATION
+    instrumentation = ACTIVE_INSTRUMENTATION = Instrumentation()
+    wrap_counted_calls(instrumentation)
+
+    for sink in sinks:
+        sink.start()
+
+    try:
+        yield instrumentation
+
+    finally:
+        ACTIVE_INSTRUMENTATION = previous
+        wrap_counted_calls(previous)
+        report = instrumentation.finish()
+
+        for sink in sinks:
+            sink.finish(report)
@@ -1,10 +1,10 @@
-import random
-from collections import defaultdict
 from dataclasses import dataclass, field
+from typing import Optional
 
-from tabulate import tabulate
-
-from match import Match, MatchConfig, build_match_display
+from match import MatchConfig, build_match_display, play_match
+from random_stream import RandomSource, RandomStream, as_stream
+from rating_state import RatingState
+from renderer import LineWriter, TableFormat, format_table, render_to_string
 from simulation import Simulation, SimulationResult
 from team import Team, TeamState
 from utils import get_win_data_from_goals
@@ -29,16 +29,31 @@ class KnockoutTieResult(SimulationResult):
     winning_data: TeamTieData
     losing_data: TeamTieData
 
-    def display(self, show_elo: bool = False) -> str:
+    def display(
+            self,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        return render_to_string(
+            self.render, show_elo=show_elo, table_format=table_format
+        )
+
+    def render(
+            self,
+            writer: LineWriter,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> None:
 
         if len(self.winning_data.goal_list) == 1:
-            return build_match_display(
+            writer.write_line(build_match_display(
                 self.winning_state,
                 self.winning_data.total_goals,
                 self.losing_state,
                 self.losing_data.total_goals,
                 show_elo=show_elo
-            )
+            ))
+            return
 
         win_display = self.winning_state.display(show_elo=show_elo)
         lose_display = self.losing_state.display(show_elo=show_elo)
@@ -63,7 +78,9 @@ class KnockoutTieResult(SimulationResult):
         win_strings.append(f"[{self.winning_data.total_goals}]")
         lose_strings.append(f"[{self.losing_data.total_goals}]")
 
-        return tabulate([win_strings, lose_strings], tablefmt="fancy_grid")
+        writer.write_line(
+            format_table([win_strings, lose_strings], table_format=table_format)
+        )
 
 
 @dataclass
@@ -71,6 +88,10 @@ class KnockoutTieConfig:
     legs: int = 2
     away_rule: bool = True
 
+    @property
+    def decides_on_away_goals(self) -> bool:
+        return self.away_rule and self.legs % 2 == 0
+
 
 @dataclass
 class KnockoutTie(Simulation):
@@ -79,61 +100,95 @@ class KnockoutTie(Simulation):
     match_config: MatchConfig = MatchConfig()
     tie_config: KnockoutTieConfig = KnockoutTieConfig()
 
-    def simulate(self) -> KnockoutTieResult:
-        og_elo_dict: dict[Team, float] = {
-            self.team1: self.team1.elo,
-            self.team2: self.team2.elo
-        }
+    def get_teams(self) -> list[Team]:
+        return [self.team1, self.team2]
 
-        team_data: dict[Team, TeamTieData] = defaultdict(lambda: TeamTieData())
-        away_goal_dict: dict[Team, int] = defaultdict(lambda: 0)
+    def play(
+            self, stream: RandomStream, ratings: RatingState
+    ) -> tuple[Team, Team, list[int], list[int]]:
+        team1_goals: list[int] = []
+        team2_goals: list[int] = []
+        team1_away_goals = team2_away_goals = 0
 
         for leg in range(self.tie_config.legs):
 
             if leg % 2 == 0:
-                home_team, away_team = self.team1, self.team2
+                home_goals, away_goals, _ = play_match(
+                    self.team1, self.team2, self.match_config,
+                    stream.random, ratings
+                )
+                team1_goals.append(home_goals)
+                team2_goals.append(away_goals)
+                team2_away_goals += away_goals
 
             else:
-                home_team, away_team = self.team2, self.team1
-
-            result = Match(home_team, away_team, self.match_config).simulate()
-
-            team_data[home_team].total_goals += result.home_goals
-            tie_goal = TieGoal(result.home_goals, False)
-            team_data[home_team].goal_list.append(tie_goal)
-            away_goal_dict[away_team] += 1
-
-            team_data[away_team].total_goals += result.away_goals
-            tie_goal = TieGoal(result.away_goals, True)
-            team_data[away_team].goal_list.append(tie_goal)
-            away_goal_dict[home_team] += 1
+                home_goals, away_goals, _ = play_match(
+                    self.team2, self.team1, self.match_config,
+                    stream.random, ratings
+                )
+                team2_goals.append(home_goals)
+                team1_goals.append(away_goals)
+                team1_away_goals += away_goals
 
         win_data = get_win_data_from_goals(
-            self.team1, self.team2,
-            team_data[self.team1].total_goals, team_data[self.team2].total_goals
+            self.team1, self.team2, sum(team1_goals), sum(team2_goals)
         )
 
         if win_data.winner:
             winner, loser = win_data.winner, win_data.loser
 
         else:
-            winner = random.choice([self.team1, self.team2])
+            winner = stream.choice([self.team1, self.team2])
             loser = self.team1 if winner == self.team2 else self.team2
 
-            if self.tie_config.away_rule:
+            if self.tie_config.decides_on_away_goals:
                 away_win_data = get_win_data_from_goals(
-                    self.team1, self.team2,
-                    away_goal_dict[self.team1], away_goal_dict[self.team2]
+                    self.team1, self.team2, team1_away_goals, team2_away_goals
                 )
 
                 if away_win_data.winner:
                     winner, loser = away_win_data.winner, away_win_data.loser
 
+        return winner, loser, team1_goals, team2_goals
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> KnockoutTieResult:
+        stream = as_stream(rng)
+        ratings = ratings if ratings is not None else RatingState()
+
+        og_elo_dict: dict[Team, float] = {
+            self.team1: ratings.get_elo(self.team1),
+            self.team2: ratings.get_elo(self.team2)
+        }
+
+        winner, loser, team1_goals, team2_goals = self.play(stream, ratings)
+
+        team_data: dict[Team, TeamTieData] = {
+            self.team1: TeamTieData(sum(team1_goals)),
+            self.team2: TeamTieData(sum(team2_goals))
+        }
+
+        for leg, (team1_leg_goals, team2_leg_goals) in enumerate(
+                zip(team1_goals, team2_goals)
+        ):
+            team1_away = leg % 2 == 1
+            team1_tie_goal = TieGoal(team1_leg_goals, team1_away)
+            team2_tie_goal = TieGoal(team2_leg_goals, not team1_away)
+
+            team_data[self.team1].goal_list.append(team1_tie_goal)
+            team_data[self.team2].goal_list.append(team2_tie_goal)
+
         og_win_elo = og_elo_dict[winner]
         og_lose_elo = og_elo_dict[loser]
 
-        win_state = TeamState(winner, og_win_elo, winner.elo - og_win_elo)
-        lose_state = TeamState(loser, og_lose_elo, loser.elo - og_lose_elo)
+        win_elo_change = ratings.get_elo(winner) - og_win_elo
+        lose_elo_change = ratings.get_elo(loser) - og_lose_elo
+
+        win_state = TeamState(winner, og_win_elo, win_elo_change)
+        lose_state = TeamState(loser, og_lose_elo, lose_elo_change)
 
         return KnockoutTieResult(
             win_state, lose_state, team_data[winner], team_data[loser]
@@ -1,12 +1,17 @@
-import random
-from collections import defaultdict
 from dataclasses import dataclass, field
+from typing import Iterable, Optional
 
-from tabulate import tabulate
-
-from match import Match, MatchResult, MatchConfig
-from simulation import Simulation, SimulationResult
-from team import Team, TeamState, create_dummy
+from instrumentation import add_count
+from match import Match, MatchResult, MatchConfig, play_match
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import LineWriter, TableFormat, format_table, render_to_string
+from schedule import get_round_robin_schedule
+from simulation import (
+    EventStream, Retention, Simulation, SimulationEvent, SimulationResult,
+    run_events
+)
+from team import Team, TeamState
 
 
 @dataclass
@@ -34,19 +39,35 @@ class LeagueResult(SimulationResult):
     entries: list[TeamLeagueEntry] = field(default_factory=list)
 
     def display(
-            self, show_elo: bool = False, show_matches: bool = False
+            self,
+            show_elo: bool = False,
+            show_matches: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
     ) -> str:
-        output: list[str] = []
+        return render_to_string(
+            self.render,
+            show_elo=show_elo,
+            show_matches=show_matches,
+            table_format=table_format
+        )
+
+    def render(
+            self,
+            writer: LineWriter,
+            show_elo: bool = False,
+            show_matches: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> None:
 
         if show_matches:
 
             for i, day_match_results in enumerate(self.match_results_per_day):
-                output.append(f"DAY {i + 1}\n")
+                writer.write_line(f"DAY {i + 1}\n")
 
                 for match_result in day_match_results:
-                    output.append(match_result.display(show_elo=show_elo))
+                    writer.write_line(match_result.display(show_elo=show_elo))
 
-                output.append("")
+                writer.write_line("")
 
         table: list[list[str]] = []
 
@@ -59,9 +80,61 @@ class LeagueResult(SimulationResult):
             table.append(entry_list)
 
         headers = ["Team", "MP", "W", "D", "L", "GF", "GA", "GD", "P"]
-        output.append(tabulate(table, headers=headers, tablefmt="fancy_grid"))
+        writer.write_line(format_table(table, headers, table_format))
 
-        return "\n".join(output)
+
+@dataclass
+class MatchEvent(SimulationEvent):
+    day: int
+    result: MatchResult
+    group: Optional[int] = None
+
+
+@dataclass
+class MatchdayEvent(SimulationEvent):
+    day: int
+    group: Optional[int] = None
+
+
+@dataclass
+class LeagueEvent(SimulationEvent):
+    winner: Team
+    entries: list[TeamLeagueEntry]
+    group: Optional[int] = None
+    retention: Retention = Retention.FULL
+
+
+def retain_league_result(
+        league_result: LeagueResult, retention: Retention
+) -> LeagueResult:
+    if retention == Retention.WINNER:
+        return LeagueResult(league_result.winner)
+
+    if retention == Retention.STANDINGS:
+        return LeagueResult(league_result.winner, [], league_result.entries)
+
+    return league_result
+
+
+def fold_league_events(events: Iterable[SimulationEvent]) -> LeagueResult:
+    match_results_per_day: list[list[MatchResult]] = []
+
+    for event in events:
+
+        if isinstance(event, MatchEvent):
+
+            while len(match_results_per_day) <= event.day:
+                match_results_per_day.append([])
+
+            match_results_per_day[event.day].append(event.result)
+
+        elif isinstance(event, LeagueEvent):
+            league_result = LeagueResult(
+                event.winner, match_results_per_day, event.entries
+            )
+            return retain_league_result(league_result, event.retention)
+
+    raise ValueError("Event stream ended before the league finished")
 
 
 @dataclass
@@ -77,87 +150,114 @@ class League(Simulation):
     teams: list[Team] = field(default_factory=list)
     match_config: MatchConfig = MatchConfig()
     league_config: LeagueConfig = LeagueConfig()
+    retention: Retention = Retention.FULL
+
+    def get_teams(self) -> list[Team]:
+        return self.teams
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> LeagueResult:
+        return run_events(self.run(rng, ratings))
+
+    def run(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None,
+            emit_events: bool = False
+    ) -> EventStream:
+        stream = as_stream(rng)
+        ratings = ratings if ratings is not None else RatingState()
+
+        og_elos: list[float] = [ratings.get_elo(team) for team in self.teams]
+
+        schedule = get_round_robin_schedule(
+            len(self.teams), self.league_config.replays
+        )
 
-    def simulate(self) -> LeagueResult:
-        og_elo_dict: dict[Team, float] = {team: team.elo for team in self.teams}
+        add_count("matches", len(schedule.home_ids))
 
-        home_pool = self.teams[:len(self.teams) // 2]
-        away_pool = self.teams[len(self.teams) // 2:][::-1]
+        retain_matches = self.retention == Retention.FULL
+        build_matches = retain_matches or emit_events
+        match_results_per_day: list[list[MatchResult]] = []
+        team_data: list[TeamLeagueData] = [
+            TeamLeagueData() for _ in self.teams
+        ]
 
-        team_count = len(self.teams)
+        for day in range(schedule.day_count):
+            match_results: list[MatchResult] = []
 
-        if len(self.teams) % 2 == 1:
-            home_pool.append(create_dummy())
-            team_count += 1
+            for home_id, away_id in schedule.get_day_fixtures(day):
+                home_team = self.teams[home_id]
+                away_team = self.teams[away_id]
 
-        match_results_per_day: list[list[MatchResult]] = []
+                if build_matches:
+                    match = Match(home_team, away_team, self.match_config)
+                    result = match.simulate(stream, ratings)
+                    home_goals = result.home_goals
+                    away_goals = result.away_goals
 
-        team_data: dict[Team, TeamLeagueData] = defaultdict(
-            lambda: TeamLeagueData()
-        )
+                else:
+                    home_goals, away_goals, _ = play_match(
+                        home_team, away_team, self.match_config,
+                        stream.random, ratings
+                    )
 
-        days = team_count * (self.league_config.replays + 1) - \
-            self.league_config.replays - 1
+                home_data = team_data[home_id]
+                away_data = team_data[away_id]
 
-        for i in range(days):
-            match_results: list[MatchResult] = []
+                home_data.played += 1
+                away_data.played += 1
 
-            for home_team, away_team in zip(home_pool, away_pool):
+                home_data.goals_for += home_goals
+                away_data.goals_for += away_goals
 
-                if i % 2 == 0:
-                    home_team, away_team = away_team, home_team
+                net_home_goals = home_goals - away_goals
+                home_data.goal_diff += net_home_goals
+                away_data.goal_diff -= net_home_goals
 
-                if not home_team.dummy and not away_team.dummy:
-                    match = Match(home_team, away_team, self.match_config)
-                    result = match.simulate()
-                    match_results.append(result)
+                home_data.goals_against += away_goals
+                away_data.goals_against += home_goals
 
-                    team_data[home_team].played += 1
-                    team_data[away_team].played += 1
+                if net_home_goals:
 
-                    team_data[home_team].goals_for += result.home_goals
-                    team_data[away_team].goals_for += result.away_goals
+                    if net_home_goals > 0:
+                        win_data, lose_data = home_data, away_data
 
-                    net_home_goals = result.home_goals - result.away_goals
-                    team_data[home_team].goal_diff += net_home_goals
-                    team_data[away_team].goal_diff -= net_home_goals
+                    else:
+                        win_data, lose_data = away_data, home_data
 
-                    team_data[home_team].goals_against += result.away_goals
-                    team_data[away_team].goals_against += result.home_goals
+                    win_data.wins += 1
+                    lose_data.losses += 1
 
-                    if result.win_data.winner == home_team:
-                        team_data[result.win_data.loser].losses += 1
-                        team_data[result.win_data.winner].wins += 1
+                    win_data.points += self.league_config.win_points
+                    lose_data.points += self.league_config.loss_points
 
-                        team_data[result.win_data.winner].points += (
-                            self.league_config.win_points
-                        )
-                        team_data[result.win_data.loser].points += (
-                            self.league_config.loss_points
-                        )
+                else:
+                    home_data.draws += 1
+                    away_data.draws += 1
 
-                    else:
-                        team_data[home_team].draws += 1
-                        team_data[away_team].draws += 1
+                    home_data.points += self.league_config.draw_points
+                    away_data.points += self.league_config.draw_points
 
-                        team_data[home_team].points += (
-                            self.league_config.draw_points
-                        )
-                        team_data[away_team].points += (
-                            self.league_config.draw_points
-                        )
+                if retain_matches:
+                    match_results.append(result)
+
+                if emit_events:
+                    yield MatchEvent(day, result)
 
-            match_results_per_day.append(match_results)
+            if retain_matches:
+                match_results_per_day.append(match_results)
 
-            away_pool.append(home_pool.pop())
-            home_pool.insert(1, away_pool[0])
-            away_pool.remove(away_pool[0])
+            if emit_events:
+                yield MatchdayEvent(day)
 
         unsorted_entries: list[TeamLeagueEntry] = []
 
-        for team, data in team_data.items():
-            og_elo = og_elo_dict[team]
-            state = TeamState(team, og_elo, team.elo - og_elo)
+        for team, og_elo, data in zip(self.teams, og_elos, team_data):
+            state = TeamState(team, og_elo, ratings.get_elo(team) - og_elo)
             unsorted_entries.append(TeamLeagueEntry(state, data))
 
         all_entries: list[TeamLeagueEntry] = sorted(
@@ -181,9 +281,19 @@ class League(Simulation):
                 else:
                     break
 
-            random.shuffle(tied_entries)
+            stream.shuffle(tied_entries)
             all_entries[:len(tied_entries)] = tied_entries
 
+        if emit_events:
+            yield LeagueEvent(
+                all_entries[0].state.team,
+                all_entries,
+                retention=self.retention
+            )
+
+        if self.retention == Retention.WINNER:
+            return LeagueResult(all_entries[0].state.team)
+
         return LeagueResult(
             all_entries[0].state.team, match_results_per_day, all_entries
         )
@@ -1,28 +1,61 @@
 import os
+import sys
 
 from group_tournament import GroupTournament, GroupConfig
-from reader import read_teams_from_csv
-from scraper import scrape_teams_from_web
+from reader import read_region_digests, read_teams_from_csv
+from scraper import ScraperConfig, refresh_teams, scrape_teams_from_web
 from team import Team
-from writer import write_teams_to_csv
+from writer import write_region_digests, write_teams_to_csv
 
 TEAM_PATH = "teams.csv"
 CONFIG_PATH = "config.json"
+HTTP_CACHE_PATH = ".http_cache"
 
 
 def prepare_teams(team_path: str) -> list[Team]:
     if os.path.exists(team_path):
         return read_teams_from_csv(team_path)
-    teams = scrape_teams_from_web()
+    teams = scrape_teams_from_web(ScraperConfig(cache_dir=HTTP_CACHE_PATH))
     write_teams_to_csv(team_path, teams)
     return teams
 
 
+def refresh_team_file(
+        team_path: str,
+        scraper_config: ScraperConfig = ScraperConfig(cache_dir=HTTP_CACHE_PATH)
+) -> list[Team]:
+    stored_teams: list[Team] = []
+    region_digests: dict[str, str] = {}
+
+    if os.path.exists(team_path):
+        stored_teams = read_teams_from_csv(team_path)
+        region_digests = read_region_digests(team_path)
+
+    result = refresh_teams(stored_teams, scraper_config, region_digests)
+
+    if result.changed_regions:
+        write_teams_to_csv(team_path, result.teams)
+
+    if result.region_digests != region_digests:
+        write_region_digests(team_path, result.region_digests)
+
+    return result.teams
+
+
 def main() -> None:
+    force_refresh = "--force-refresh" in sys.argv[1:]
+
+    if force_refresh or "--refresh" in sys.argv[1:]:
+        refresh_team_file(TEAM_PATH, ScraperConfig(
+            cache_dir=HTTP_CACHE_PATH, force_refresh=force_refresh
+        ))
+
     teams = prepare_teams(TEAM_PATH)
     teams.sort(key=lambda team: team.elo, reverse=True)
     simulation = GroupTournament(teams, group_config=GroupConfig(group_size=16, advancing_per_group=4))
-    print(simulation.simulate().display(show_elo=True, show_group_matches=True))
+    simulation.simulate().write(
+        sys.stdout, show_elo=True, show_group_matches=True
+    )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
-import random
 from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional
 
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import LineWriter, TableFormat
+from score_distribution import get_score_sampler
 from simulation import Simulation, SimulationResult
 from team import Team, TeamState
-from utils import get_win_data_from_goals, OptionalWinData
+from utils import get_win_data_from_goals, OptionalWinData, sample_binomial
 
 
 def build_match_display(
@@ -39,6 +44,20 @@ class MatchResult(SimulationResult):
             show_elo=show_elo
         )
 
+    def render(
+            self,
+            writer: LineWriter,
+            show_elo: bool = False,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> None:
+        writer.write_line(self.display(show_elo=show_elo))
+
+
+class MatchEngine(Enum):
+    PER_SECOND = "per_second"
+    BINOMIAL = "binomial"
+    LOOKUP = "lookup"
+
 
 @dataclass
 class MatchConfig:
@@ -48,53 +67,114 @@ class MatchConfig:
     home_advantage: float = 60
     match_minutes: float = 90
     dynamic_elo: bool = True
+    engine: MatchEngine = MatchEngine.BINOMIAL
+    lookup_elo_step: float = 1
+
+
+def update_elo(
+        home_team: Team,
+        away_team: Team,
+        match_config: MatchConfig,
+        ratings: RatingState,
+        home_goals: int,
+        away_goals: int,
+        home_win_chance: float
+) -> float:
+    if not match_config.dynamic_elo:
+        return 0
+
+    result = 1 if home_goals > away_goals else 0
+    home_elo_gain = match_config.elo_con_var_idx * (result - home_win_chance)
+    ratings.add_elo(home_team, home_elo_gain)
+    ratings.add_elo(away_team, -home_elo_gain)
+
+    return home_elo_gain
+
+
+def play_match(
+        home_team: Team,
+        away_team: Team,
+        match_config: MatchConfig,
+        uniform: Callable[[], float],
+        ratings: RatingState
+) -> tuple[int, int, float]:
+    home_elo = ratings.get_elo(home_team)
+    away_elo = ratings.get_elo(away_team)
+
+    elo_diff = away_elo - home_elo - match_config.home_advantage
+    weighted_elo_diff = elo_diff / match_config.elo_weight
+    home_win_chance = 1 / (10 ** weighted_elo_diff + 1)
+
+    if match_config.engine == MatchEngine.LOOKUP:
+        score_sampler = get_score_sampler(
+            match_config.elo_weight,
+            match_config.goals_per_game,
+            match_config.match_minutes,
+            match_config.lookup_elo_step
+        )
+        home_goals, away_goals = score_sampler.sample(elo_diff, uniform())
 
+        return home_goals, away_goals, update_elo(
+            home_team, away_team, match_config, ratings,
+            home_goals, away_goals, home_win_chance
+        )
 
-@dataclass
-class Match(Simulation):
-    home_team: Team
-    away_team: Team
-    match_config: MatchConfig = MatchConfig()
-
-    def simulate(self) -> MatchResult:
-        og_home_elo, og_away_elo = self.home_team.elo, self.away_team.elo
-
-        elo_diff = og_away_elo - og_home_elo - self.match_config.home_advantage
-        weighted_elo_diff = elo_diff / self.match_config.elo_weight
-        home_win_chance = 1 / (10 ** weighted_elo_diff + 1)
+    goals_per_game = match_config.goals_per_game
+    goals_per_sec = goals_per_game / match_config.match_minutes / 60
 
-        goals_per_game = self.match_config.goals_per_game
-        goals_per_sec = goals_per_game / self.match_config.match_minutes / 60
+    seconds = int(match_config.match_minutes * 60)
 
+    if match_config.engine == MatchEngine.PER_SECOND:
         home_goals = away_goals = 0
 
-        for second in range(int(self.match_config.match_minutes * 60)):
+        for second in range(seconds):
 
-            if goals_per_sec > random.random():
+            if goals_per_sec > uniform():
 
-                if home_win_chance > random.random():
+                if home_win_chance > uniform():
                     home_goals += 1
 
                 else:
                     away_goals += 1
 
-        win_data = get_win_data_from_goals(
-            self.home_team, self.away_team, home_goals, away_goals
-        )
+    else:
+        goals = sample_binomial(seconds, goals_per_sec, uniform)
+        home_goals = sample_binomial(goals, home_win_chance, uniform)
+        away_goals = goals - home_goals
+
+    return home_goals, away_goals, update_elo(
+        home_team, away_team, match_config, ratings,
+        home_goals, away_goals, home_win_chance
+    )
+
+
+@dataclass
+class Match(Simulation):
+    home_team: Team
+    away_team: Team
+    match_config: MatchConfig = MatchConfig()
 
-        if win_data.winner:
-            result = 1 if win_data.winner == self.home_team else 0
+    def get_teams(self) -> list[Team]:
+        return [self.home_team, self.away_team]
 
-        else:
-            result = 0
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> MatchResult:
+        uniform = as_stream(rng).random
+        ratings = ratings if ratings is not None else RatingState()
 
-        home_elo_gain = 0
+        og_home_elo = ratings.get_elo(self.home_team)
+        og_away_elo = ratings.get_elo(self.away_team)
+
+        home_goals, away_goals, home_elo_gain = play_match(
+            self.home_team, self.away_team, self.match_config, uniform, ratings
+        )
 
-        if self.match_config.dynamic_elo:
-            elo_con_var_idx = self.match_config.elo_con_var_idx
-            home_elo_gain = elo_con_var_idx * (result - home_win_chance)
-            self.home_team.elo += home_elo_gain
-            self.away_team.elo -= home_elo_gain
+        win_data = get_win_data_from_goals(
+            self.home_team, self.away_team, home_goals, away_goals
+        )
 
         home_state = TeamState(self.home_team, og_home_elo, home_elo_gain)
         away_state = TeamState(self.away_team, og_away_elo, -home_elo_gain)
@@ -0,0 +1,473 @@
+import copy
+import dataclasses
+import math
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Optional
+
+from batch_bracket import BatchBracketResult
+from bracket import BracketResult
+from group_tournament import GroupTournamentResult
+from knockout_tie import KnockoutTieResult
+from league import LeagueResult
+from match import MatchResult
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import TableFormat, format_table
+from simulation import (
+    Retention, SeededSimulation, Simulation, SimulationResult
+)
+from team import Team
+
+
+@dataclass
+class TeamOutcome:
+    won: bool = False
+    stage: int = 0
+    position: int = 0
+
+
+@dataclass
+class TeamAggregate:
+    runs: int = 0
+    wins: int = 0
+    elo_delta_sum: float = 0
+    stage_counts: Counter = field(default_factory=Counter)
+    position_counts: Counter = field(default_factory=Counter)
+
+    @property
+    def win_chance(self) -> float:
+        return self.wins / self.runs if self.runs else 0
+
+    @property
+    def mean_elo_delta(self) -> float:
+        return self.elo_delta_sum / self.runs if self.runs else 0
+
+    def get_stage_chance(self, stage: int) -> float:
+        reached = sum(c for s, c in self.stage_counts.items() if s >= stage)
+        return reached / self.runs if self.runs else 0
+
+    def add(self, outcome: TeamOutcome, elo_delta: float) -> None:
+        self.runs += 1
+        self.wins += outcome.won
+        self.elo_delta_sum += elo_delta
+        self.stage_counts[outcome.stage] += 1
+
+        if outcome.position:
+            self.position_counts[outcome.position] += 1
+
+    def merge(self, other: "TeamAggregate") -> None:
+        self.runs += other.runs
+        self.wins += other.wins
+        self.elo_delta_sum += other.elo_delta_sum
+        self.stage_counts.update(other.stage_counts)
+        self.position_counts.update(other.position_counts)
+
+
+def merge_aggregates(
+        aggregates: dict[str, TeamAggregate],
+        other: dict[str, TeamAggregate]
+) -> None:
+    for name, aggregate in other.items():
+
+        if name in aggregates:
+            aggregates[name].merge(aggregate)
+
+        else:
+            aggregates[name] = copy.deepcopy(aggregate)
+
+
+def check_standings(result: SimulationResult, standings: list) -> None:
+    if not standings:
+        raise ValueError(
+            f"{type(result).__name__} holds no standings; simulate it at "
+            "Retention.STANDINGS or FULL"
+        )
+
+
+def get_team_outcomes(result: SimulationResult) -> dict[str, TeamOutcome]:
+    outcomes: dict[str, TeamOutcome] = {}
+
+    if isinstance(result, MatchResult):
+        outcomes[result.home_state.team.name] = TeamOutcome()
+        outcomes[result.away_state.team.name] = TeamOutcome()
+
+        if result.win_data.winner:
+            outcomes[result.win_data.winner.name] = TeamOutcome(True, 1)
+
+    elif isinstance(result, KnockoutTieResult):
+        outcomes[result.winning_state.team.name] = TeamOutcome(True, 1)
+        outcomes[result.losing_state.team.name] = TeamOutcome()
+
+    elif isinstance(result, LeagueResult):
+        check_standings(result, result.entries)
+
+        for i, entry in enumerate(result.entries):
+            outcome = TeamOutcome(i == 0, 0, i + 1)
+            outcomes[entry.state.team.name] = outcome
+
+    elif isinstance(result, BracketResult):
+        check_standings(result, result.all_round_data)
+
+        for i, round_data in enumerate(result.all_round_data):
+
+            for loser in round_data.losers:
+                outcomes[loser.name] = TeamOutcome(False, i)
+
+        final_stage = len(result.all_round_data)
+        outcomes[result.winner.name] = TeamOutcome(True, final_stage)
+
+    elif isinstance(result, BatchBracketResult):
+        check_standings(result, result.all_round_data)
+
+        for i, round_data in enumerate(result.all_round_data):
+
+            for loser_id in round_data.loser_ids:
+                outcomes[result.teams[loser_id].name] = TeamOutcome(False, i)
+
+        final_stage = len(result.all_round_data)
+        outcomes[result.winner.name] = TeamOutcome(True, final_stage)
+
+    elif isinstance(result, GroupTournamentResult):
+        check_standings(result, result.all_group_data)
+
+        for team in result.teams_with_group_bye:
+            outcomes[team.name] = TeamOutcome()
+
+        for group_data in result.all_group_data:
+
+            for i, entry in enumerate(group_data.league_result.entries):
+                outcomes[entry.state.team.name] = TeamOutcome(False, 0, i + 1)
+
+        bracket_outcomes = get_team_outcomes(result.bracket_result)
+
+        for name, outcome in bracket_outcomes.items():
+            group_outcome = outcomes.setdefault(name, TeamOutcome())
+            group_outcome.won = outcome.won
+            group_outcome.stage = outcome.stage + 1
+
+    else:
+        raise TypeError(f"Unsupported result type {type(result).__name__}")
+
+    return outcomes
+
+
+def get_base_seed(seed: int, rng: Optional[RandomSource]) -> int:
+    if rng is None:
+        return seed
+
+    return as_stream(rng).get_seed()
+
+
+def get_run_seed(seed: int, run: int) -> int:
+    return (seed << 64) + run
+
+
+def simulate_runs(
+        simulation: Simulation,
+        seed: int,
+        start: int,
+        stop: int,
+        base_ratings: Optional[RatingState] = None
+) -> dict[str, TeamAggregate]:
+    aggregates: dict[str, TeamAggregate] = {}
+    base_ratings = (
+        base_ratings if base_ratings is not None else RatingState()
+    )
+    ratings = RatingState()
+
+    for run in range(start, stop):
+        ratings.reset()
+        ratings.update(base_ratings)
+        rng = random.Random(get_run_seed(seed, run))
+        outcomes = get_team_outcomes(simulation.simulate(rng, ratings))
+
+        for team in simulation.get_teams():
+
+            if team.name not in aggregates:
+                aggregates[team.name] = TeamAggregate()
+
+            elo_delta = ratings.get_elo(team) - base_ratings.get_elo(team)
+            outcome = outcomes.get(team.name, TeamOutcome())
+            aggregates[team.name].add(outcome, elo_delta)
+
+    return aggregates
+
+
+@dataclass
+class MonteCarloResult(SimulationResult):
+    runs: int
+    aggregates: dict[str, TeamAggregate] = field(default_factory=dict)
+
+    def display(
+            self,
+            limit: Optional[int] = None,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        entries = sorted(
+            self.aggregates.items(),
+            key=lambda item: (-item[1].wins, -item[1].mean_elo_delta)
+        )
+
+        table: list[list[str]] = []
+
+        for i, (name, aggregate) in enumerate(entries[:limit]):
+            table.append([
+                f"{i + 1}. {name}",
+                f"{100 * aggregate.win_chance:.2f}%",
+                f"{100 * aggregate.get_stage_chance(1):.2f}%",
+                f"{aggregate.mean_elo_delta:+.1f}"
+            ])
+
+        headers = ["Team", "Win", "Advance", "Elo"]
+        output = [f"{self.runs} RUNS"]
+        output.append(format_table(table, headers, table_format))
+
+        return "\n".join(output)
+
+
+def get_interval_half_width(chance: float, runs: int, z: float) -> float:
+    if not runs:
+        return 1
+
+    spread = z * z / runs
+    variance = chance * (1 - chance) / runs + spread / (4 * runs)
+
+    return z * math.sqrt(variance) / (1 + spread)
+
+
+def get_max_error(aggregates: dict[str, TeamAggregate], z: float) -> float:
+    max_error = 0
+
+    for aggregate in aggregates.values():
+        chances = [aggregate.win_chance] + [
+            aggregate.get_stage_chance(stage)
+            for stage in aggregate.stage_counts if stage > 0
+        ]
+
+        for chance in chances:
+            max_error = max(
+                max_error, get_interval_half_width(chance, aggregate.runs, z)
+            )
+
+    return max_error
+
+
+def prepare_simulation(
+        simulation: Simulation, retention: Retention
+) -> Simulation:
+    if hasattr(simulation, "retention"):
+        return dataclasses.replace(simulation, retention=retention)
+
+    return simulation
+
+
+def prepare_outcome_simulation(
+        simulation: Simulation, retention: Retention
+) -> Simulation:
+    if retention == Retention.WINNER:
+        raise ValueError(
+            "Team outcomes need standings; use Retention.STANDINGS or FULL"
+        )
+
+    return prepare_simulation(simulation, retention)
+
+
+def get_chunks(start: int, stop: int, chunk_size: int) -> list[tuple[int, int]]:
+    return [
+        (chunk_start, min(chunk_start + chunk_size, stop))
+        for chunk_start in range(start, stop, chunk_size)
+    ]
+
+
+def simulate_chunks(
+        simulation: Simulation,
+        seed: int,
+        chunks: list[tuple[int, int]],
+        executor: Optional[ProcessPoolExecutor] = None,
+        base_ratings: Optional[RatingState] = None
+) -> dict[str, TeamAggregate]:
+    aggregates: dict[str, TeamAggregate] = {}
+
+    if executor is None:
+
+        for start, stop in chunks:
+            merge_aggregates(aggregates, simulate_runs(
+                simulation, seed, start, stop, base_ratings
+            ))
+
+    else:
+        chunk_aggregates = executor.map(
+            simulate_runs,
+            [simulation] * len(chunks),
+            [seed] * len(chunks),
+            [start for start, _ in chunks],
+            [stop for _, stop in chunks],
+            [base_ratings] * len(chunks)
+        )
+
+        for other in chunk_aggregates:
+            merge_aggregates(aggregates, other)
+
+    return aggregates
+
+
+@dataclass
+class MonteCarloConfig:
+    runs: int = 1000
+    first_run: int = 0
+    workers: Optional[int] = None
+    seed: int = 0
+    chunk_size: int = 250
+    retention: Retention = Retention.STANDINGS
+
+
+@dataclass
+class MonteCarlo(SeededSimulation):
+    simulation: Simulation
+    monte_carlo_config: MonteCarloConfig = MonteCarloConfig()
+
+    def get_teams(self) -> list[Team]:
+        return self.simulation.get_teams()
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> MonteCarloResult:
+        config = self.monte_carlo_config
+        workers = config.workers or os.cpu_count() or 1
+        seed = get_base_seed(config.seed, rng)
+        simulation = prepare_outcome_simulation(
+            self.simulation, config.retention
+        )
+        chunks = get_chunks(
+            config.first_run, config.first_run + config.runs, config.chunk_size
+        )
+
+        if workers == 1:
+            aggregates = simulate_chunks(
+                simulation, seed, chunks, base_ratings=ratings
+            )
+
+        else:
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                aggregates = simulate_chunks(
+                    simulation, seed, chunks, executor, ratings
+                )
+
+        return MonteCarloResult(config.runs, aggregates)
+
+
+@dataclass
+class AdaptiveMonteCarloResult(MonteCarloResult):
+    error: float = 1
+    confidence: float = 0.95
+    seconds: float = 0
+    stopped_by: str = ""
+
+    def display(
+            self,
+            limit: Optional[int] = None,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        summary = (
+            f"±{100 * self.error:.2f}% at {100 * self.confidence:g}% "
+            f"confidence after {self.seconds:.1f}s ({self.stopped_by})"
+        )
+
+        return "\n".join([
+            summary, super().display(limit=limit, table_format=table_format)
+        ])
+
+
+@dataclass
+class AdaptiveMonteCarloConfig:
+    target_error: float = 0.005
+    confidence: float = 0.95
+    time_budget: Optional[float] = None
+    batch_runs: int = 1000
+    min_runs: int = 1000
+    max_runs: int = 1000000
+    workers: Optional[int] = None
+    seed: int = 0
+    chunk_size: int = 250
+    retention: Retention = Retention.STANDINGS
+
+
+@dataclass
+class AdaptiveMonteCarlo(SeededSimulation):
+    simulation: Simulation
+    adaptive_config: AdaptiveMonteCarloConfig = AdaptiveMonteCarloConfig()
+
+    @property
+    def is_reproducible(self) -> bool:
+        return self.adaptive_config.time_budget is None
+
+    def get_teams(self) -> list[Team]:
+        return self.simulation.get_teams()
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> AdaptiveMonteCarloResult:
+        config = self.adaptive_config
+        workers = config.workers or os.cpu_count() or 1
+        seed = get_base_seed(config.seed, rng)
+        simulation = prepare_outcome_simulation(
+            self.simulation, config.retention
+        )
+        z = NormalDist().inv_cdf((1 + config.confidence) / 2)
+
+        start_time = time.perf_counter()
+        aggregates: dict[str, TeamAggregate] = {}
+        runs = 0
+        error = 1.0
+        stopped_by = "max_runs"
+
+        if workers == 1:
+            executor_context = nullcontext()
+
+        else:
+            executor_context = ProcessPoolExecutor(max_workers=workers)
+
+        with executor_context as executor:
+
+            while runs < config.max_runs:
+                stop = min(runs + config.batch_runs, config.max_runs)
+                chunks = get_chunks(runs, stop, config.chunk_size)
+
+                merge_aggregates(aggregates, simulate_chunks(
+                    simulation, seed, chunks, executor, ratings
+                ))
+
+                runs = stop
+                error = get_max_error(aggregates, z)
+                seconds = time.perf_counter() - start_time
+
+                if runs >= config.min_runs and error <= config.target_error:
+                    stopped_by = "precision"
+                    break
+
+                if config.time_budget is not None and (
+                        seconds >= config.time_budget
+                ):
+                    stopped_by = "time"
+                    break
+
+        return AdaptiveMonteCarloResult(
+            runs,
+            aggregates,
+            error,
+            config.confidence,
+            time.perf_counter() - start_time,
+            stopped_by
+        )
@@ -0,0 +1,129 @@
+from functools import lru_cache
+
+from knockout_tie import KnockoutTieConfig
+from match import MatchConfig
+from score_distribution import MatchOdds, get_quantized_match_odds
+
+SCORE_TOLERANCE = 1e-12
+
+
+def get_match_odds(
+        home_elo: float,
+        away_elo: float,
+        match_config: MatchConfig = MatchConfig(),
+        elo_step: float = 1
+) -> MatchOdds:
+    elo_diff = away_elo - home_elo - match_config.home_advantage
+
+    if elo_step:
+        elo_diff = round(elo_diff / elo_step) * elo_step
+
+    return get_quantized_match_odds(
+        elo_diff,
+        match_config.elo_weight,
+        match_config.goals_per_game,
+        match_config.match_minutes
+    )
+
+
+def get_leg_outcomes(
+        match_odds: MatchOdds, team1_home: bool, away_rule: bool
+) -> list[tuple[int, int, float]]:
+    leg_outcomes: list[tuple[int, int, float]] = []
+
+    for home_goals, home_row in enumerate(match_odds.score_chances):
+
+        for away_goals, score_chance in enumerate(home_row):
+
+            if score_chance < SCORE_TOLERANCE:
+                continue
+
+            if team1_home:
+                goal_diff = home_goals - away_goals
+                away_goal_diff = -away_goals if away_rule else 0
+
+            else:
+                goal_diff = away_goals - home_goals
+                away_goal_diff = away_goals if away_rule else 0
+
+            leg_outcomes.append((goal_diff, away_goal_diff, score_chance))
+
+    return leg_outcomes
+
+
+@lru_cache(maxsize=4096)
+def get_quantized_tie_chance(
+        elo_diff: float,
+        legs: int,
+        away_rule: bool,
+        home_advantage: float,
+        elo_weight: float,
+        goals_per_game: float,
+        match_minutes: float
+) -> float:
+    team1_home_odds = get_quantized_match_odds(
+        -elo_diff - home_advantage, elo_weight, goals_per_game, match_minutes
+    )
+    team2_home_odds = get_quantized_match_odds(
+        elo_diff - home_advantage, elo_weight, goals_per_game, match_minutes
+    )
+
+    states: dict[tuple[int, int], float] = {(0, 0): 1}
+
+    for leg in range(legs):
+
+        if leg % 2 == 0:
+            leg_outcomes = get_leg_outcomes(team1_home_odds, True, away_rule)
+
+        else:
+            leg_outcomes = get_leg_outcomes(team2_home_odds, False, away_rule)
+
+        next_states: dict[tuple[int, int], float] = {}
+
+        for (goal_diff, away_goal_diff), state_chance in states.items():
+
+            for leg_goal_diff, leg_away_goal_diff, score_chance in leg_outcomes:
+                next_state = (
+                    goal_diff + leg_goal_diff,
+                    away_goal_diff + leg_away_goal_diff
+                )
+                next_states[next_state] = next_states.get(next_state, 0) + (
+                    state_chance * score_chance
+                )
+
+        states = next_states
+
+    team1_chance = 0
+
+    for (goal_diff, away_goal_diff), state_chance in states.items():
+
+        if goal_diff > 0 or not goal_diff and away_goal_diff > 0:
+            team1_chance += state_chance
+
+        elif not goal_diff and not away_goal_diff:
+            team1_chance += state_chance / 2
+
+    return team1_chance / sum(states.values())
+
+
+def get_tie_chance(
+        team1_elo: float,
+        team2_elo: float,
+        match_config: MatchConfig = MatchConfig(),
+        tie_config: KnockoutTieConfig = KnockoutTieConfig(),
+        elo_step: float = 1
+) -> float:
+    elo_diff = team1_elo - team2_elo
+
+    if elo_step:
+        elo_diff = round(elo_diff / elo_step) * elo_step
+
+    return get_quantized_tie_chance(
+        elo_diff,
+        tie_config.legs,
+        tie_config.decides_on_away_goals,
+        match_config.home_advantage,
+        match_config.elo_weight,
+        match_config.goals_per_game,
+        match_config.match_minutes
+    )
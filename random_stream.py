@@ -0,0 +1,73 @@
+import random
+from typing import TYPE_CHECKING, Any, Optional, TypeVar, Union
+
+from instrumentation import count_calls
+
+if TYPE_CHECKING:
+    import numpy
+
+T = TypeVar("T")
+
+RandomGenerator = Union[random.Random, "numpy.random.Generator"]
+
+
+class RandomStream:
+
+    def __init__(self, generator: Any = random) -> None:
+        self.generator = generator
+        self.random = generator.random
+        self.count_draws()
+
+    def count_draws(self) -> None:
+        count_calls("random_draws", self, "random")
+
+    @property
+    def is_numpy(self) -> bool:
+        return hasattr(self.generator, "bit_generator")
+
+    def shuffle(self, items: list) -> None:
+        self.generator.shuffle(items)
+
+    def choice(self, items: list[T]) -> T:
+        if self.is_numpy:
+            return items[int(self.generator.integers(len(items)))]
+
+        return self.generator.choice(items)
+
+    def get_seed(self) -> int:
+        if self.is_numpy:
+            return int(self.generator.integers(1 << 63))
+
+        return self.generator.getrandbits(64)
+
+    def spawn(self, count: int) -> list["RandomStream"]:
+        if self.is_numpy:
+            return [RandomStream(g) for g in self.generator.spawn(count)]
+
+        return [
+            RandomStream(random.Random(self.generator.getrandbits(128)))
+            for _ in range(count)
+        ]
+
+    def __getstate__(self) -> dict:
+        return {"generator": self.generator}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["generator"])
+
+
+RandomSource = Union[RandomStream, RandomGenerator]
+
+
+def as_stream(rng: Optional[RandomSource] = None) -> RandomStream:
+    if isinstance(rng, RandomStream):
+        return rng
+
+    if rng is None:
+        return RandomStream()
+
+    return RandomStream(rng)
+
+
+def create_stream(seed: int) -> RandomStream:
+    return RandomStream(random.Random(seed))
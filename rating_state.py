@@ -0,0 +1,64 @@
+from typing import Iterable, Optional
+
+from team import Team
+
+
+class RatingState:
+
+    def __init__(
+            self, elo_overlay: Optional[dict[Team, float]] = None
+    ) -> None:
+        self.teams: dict[int, Team] = {}
+        self.elos: dict[int, float] = {}
+
+        for team, elo in (elo_overlay or {}).items():
+            self.set_elo(team, elo)
+
+    @property
+    def elo_overlay(self) -> dict[Team, float]:
+        return {self.teams[key]: elo for key, elo in self.elos.items()}
+
+    def get_elo(self, team: Team) -> float:
+        elo = self.elos.get(team.key)
+        return team.elo if elo is None else elo
+
+    def get_elo_delta(self, team: Team) -> float:
+        return self.get_elo(team) - team.elo
+
+    def set_elo(self, team: Team, elo: float) -> None:
+        self.teams[team.key] = team
+        self.elos[team.key] = elo
+
+    def add_elo(self, team: Team, elo_change: float) -> None:
+        self.set_elo(team, self.get_elo(team) + elo_change)
+
+    def get_subset(self, teams: Iterable[Team]) -> "RatingState":
+        subset = RatingState()
+
+        for team in teams:
+
+            if team.key in self.elos:
+                subset.set_elo(team, self.elos[team.key])
+
+        return subset
+
+    def update(self, other: "RatingState") -> None:
+        self.teams.update(other.teams)
+        self.elos.update(other.elos)
+
+    def merge(self, other: "RatingState") -> None:
+        for team in other.teams.values():
+            self.add_elo(team, other.get_elo_delta(team))
+
+    def reset(self) -> None:
+        self.teams = {}
+        self.elos = {}
+
+    def apply(self, teams: Optional[Iterable[Team]] = None) -> None:
+        for team in list(self.teams.values()) if teams is None else teams:
+            team.elo = self.get_elo(team)
+
+        self.reset()
+
+    def __reduce__(self) -> tuple:
+        return RatingState, (self.elo_overlay,)
@@ -1,18 +1,83 @@
+import hashlib
+import json
+import os
 from csv import DictReader
 
-from team import Team
+from team import (
+    Team, TeamSnapshotHeader, TeamTable, map_team_snapshot,
+    read_snapshot_header
+)
 
 
-def read_teams_from_csv(csv_path: str) -> list[Team]:
-    teams: list[Team] = []
+def get_snapshot_path(csv_path: str) -> str:
+    return f"{csv_path}.snapshot"
+
+
+def get_region_digest_path(csv_path: str) -> str:
+    return f"{csv_path}.regions.json"
+
+
+def read_region_digests(csv_path: str) -> dict[str, str]:
+    try:
+        with open(get_region_digest_path(csv_path)) as digest_file:
+            return json.load(digest_file)
+
+    except (OSError, ValueError):
+        return {}
+
+
+def get_file_digest(path: str) -> bytes:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(1 << 16), b""):
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+def parse_teams_csv(csv_path: str) -> TeamTable:
+    table = TeamTable()
 
     with open(csv_path) as csv_file:
         for team_dict in DictReader(csv_file):
-            teams.append(Team(
+            table.add_team(
                 team_dict["Name"],
                 team_dict["Region"],
                 float(team_dict["Elo"]),
                 int(team_dict["Regional League Rank"])
-            ))
+            )
+
+    return table
+
+
+def read_teams_from_csv(csv_path: str, use_snapshot: bool = True) -> list[Team]:
+    if not use_snapshot:
+        return parse_teams_csv(csv_path).get_teams()
+
+    snapshot_path = get_snapshot_path(csv_path)
+    header = read_snapshot_header(snapshot_path)
+    csv_stat = os.stat(csv_path)
+
+    if header is not None and (
+            header.source_mtime_ns == csv_stat.st_mtime_ns
+            and header.source_size == csv_stat.st_size
+    ):
+        return map_team_snapshot(snapshot_path).get_teams()
+
+    digest = get_file_digest(csv_path)
+
+    if header is not None and header.source_digest == digest:
+        return map_team_snapshot(snapshot_path).get_teams()
+
+    table = parse_teams_csv(csv_path)
+
+    try:
+        table.write_snapshot(snapshot_path, TeamSnapshotHeader(
+            len(table), digest, csv_stat.st_mtime_ns, csv_stat.st_size
+        ))
+
+    except OSError:
+        pass
 
-    return teams
+    return table.get_teams()
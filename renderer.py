@@ -0,0 +1,91 @@
+from enum import Enum
+from io import StringIO
+from typing import Any, Optional, TextIO
+
+from tabulate import tabulate
+
+
+class TableFormat(Enum):
+    FANCY_GRID = "fancy_grid"
+    PLAIN = "plain"
+
+
+class LineWriter:
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.started = False
+
+    def write_line(self, line: str) -> None:
+        if self.started:
+            self.stream.write("\n")
+
+        self.stream.write(line)
+        self.started = True
+
+
+def is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def format_plain_value(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return str(value)
+
+
+def format_plain_table(
+        rows: list[list[Any]], headers: Optional[list[str]] = None
+) -> str:
+    column_count = max(len(row) for row in rows + [headers or []])
+    cells = [[format_plain_value(value) for value in row] for row in rows]
+    header_cells = headers or []
+
+    widths = [0] * column_count
+    right_aligned = [True] * column_count
+
+    for row, cell_row in zip(rows, cells):
+
+        for i, (value, cell) in enumerate(zip(row, cell_row)):
+            widths[i] = max(widths[i], len(cell))
+            right_aligned[i] = right_aligned[i] and is_number(value)
+
+    for i, header in enumerate(header_cells):
+        widths[i] = max(widths[i], len(header))
+
+    def format_row(cell_row: list[str]) -> str:
+        return "  ".join(
+            cell.rjust(widths[i]) if right_aligned[i] else cell.ljust(widths[i])
+            for i, cell in enumerate(cell_row)
+        ).rstrip()
+
+    lines: list[str] = []
+
+    if header_cells:
+        lines.append(format_row(header_cells))
+        lines.append("  ".join("-" * width for width in widths))
+
+    lines.extend(format_row(cell_row) for cell_row in cells)
+
+    return "\n".join(lines)
+
+
+def format_table(
+        rows: list[list[Any]],
+        headers: Optional[list[str]] = None,
+        table_format: TableFormat = TableFormat.FANCY_GRID
+) -> str:
+    if table_format == TableFormat.PLAIN:
+        return format_plain_table(rows, headers)
+
+    if headers:
+        return tabulate(rows, headers=headers, tablefmt="fancy_grid")
+
+    return tabulate(rows, tablefmt="fancy_grid")
+
+
+def render_to_string(render: Any, **options: Any) -> str:
+    output = StringIO()
+    render(LineWriter(output), **options)
+    return output.getvalue()
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def get_validators(self) -> dict[str, str]:
+        validators: dict[str, str] = {}
+
+        if self.etag is not None:
+            validators["If-None-Match"] = self.etag
+
+        if self.last_modified is not None:
+            validators["If-Modified-Since"] = self.last_modified
+
+        return validators
+
+
+def get_content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_atomically(path: str, content: bytes) -> None:
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(content)
+
+    os.replace(temp_path, path)
+
+
+class ResponseCache:
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key)
+
+    def load(self, url: str) -> Optional[tuple[CacheEntry, bytes]]:
+        path = self.get_path(url)
+
+        try:
+            with open(f"{path}.json") as entry_file:
+                entry = CacheEntry(**json.load(entry_file))
+
+            with open(f"{path}.body", "rb") as body_file:
+                content = body_file.read()
+
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if entry.url != url or get_content_digest(content) != entry.digest:
+            return None
+
+        return entry, content
+
+    def store(self, entry: CacheEntry, content: bytes) -> None:
+        path = self.get_path(entry.url)
+        write_atomically(f"{path}.body", content)
+        write_atomically(f"{path}.json", json.dumps(asdict(entry)).encode())
@@ -0,0 +1,193 @@
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import pickle
+import random
+from enum import Enum
+from typing import Any, BinaryIO, Optional
+
+from response_cache import write_atomically
+from simulation import SeededSimulation, Simulation, SimulationResult
+from team import Team
+
+CACHE_VERSION = 2
+IGNORED_FIELDS = {"workers", "chunk_size"}
+
+
+def describe(value: Any) -> Any:
+    if isinstance(value, Team):
+        return [
+            value.name,
+            value.region,
+            value.elo,
+            value.regional_league_rank,
+            value.dummy
+        ]
+
+    if isinstance(value, Enum):
+        return value.value
+
+    if dataclasses.is_dataclass(value):
+        description = {"type": type(value).__name__}
+
+        for value_field in dataclasses.fields(value):
+
+            if value_field.name not in IGNORED_FIELDS:
+                description[value_field.name] = describe(
+                    getattr(value, value_field.name)
+                )
+
+        return description
+
+    if isinstance(value, (list, tuple)):
+        return [describe(item) for item in value]
+
+    if isinstance(value, dict):
+        return {str(key): describe(item) for key, item in value.items()}
+
+    return value
+
+
+def get_cache_key(simulation: Simulation, seed: Optional[int] = None) -> str:
+    description = json.dumps(
+        [CACHE_VERSION, describe(simulation), seed],
+        sort_keys=True,
+        separators=(",", ":")
+    )
+
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+class TeamPickler(pickle.Pickler):
+
+    def __init__(self, result_file: BinaryIO, teams: list[Team]) -> None:
+        super().__init__(result_file)
+        self.team_ids: dict[Team, int] = {}
+
+        for team_id, team in enumerate(teams):
+            self.team_ids.setdefault(team, team_id)
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        if isinstance(obj, Team):
+            return self.team_ids.get(obj)
+
+        return None
+
+
+class TeamUnpickler(pickle.Unpickler):
+
+    def __init__(self, result_file: BinaryIO, teams: list[Team]) -> None:
+        super().__init__(result_file)
+        self.teams = teams
+
+    def persistent_load(self, team_id: Any) -> Team:
+        if not isinstance(team_id, int) or not 0 <= team_id < len(self.teams):
+            raise pickle.UnpicklingError(f"Unknown team id {team_id!r}")
+
+        return self.teams[team_id]
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+
+    except FileNotFoundError:
+        pass
+
+
+class ResultCache:
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def load(
+            self, key: str, teams: list[Team]
+    ) -> Optional[SimulationResult]:
+        path = self.get_path(key)
+
+        try:
+            with open(path, "rb") as result_file:
+                result = TeamUnpickler(result_file, teams).load()
+
+            os.utime(path)
+
+        except FileNotFoundError:
+            return None
+
+        except (
+                OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                ValueError
+        ):
+            remove_file(path)
+            return None
+
+        return result
+
+    def store(
+            self, key: str, result: SimulationResult, teams: list[Team]
+    ) -> None:
+        result_file = io.BytesIO()
+        TeamPickler(result_file, teams).dump(result)
+        write_atomically(self.get_path(key), result_file.getvalue())
+        self.evict()
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, str]] = []
+
+        for entry in os.scandir(self.directory):
+
+            if entry.name.endswith(".pickle"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+
+            if total_bytes <= self.max_bytes:
+                break
+
+            remove_file(path)
+            total_bytes -= size
+
+    def simulate(
+            self, simulation: Simulation, seed: Optional[int] = None
+    ) -> SimulationResult:
+        if isinstance(simulation, SeededSimulation):
+
+            if not simulation.is_reproducible:
+                raise ValueError(
+                    f"{type(simulation).__name__} is not reproducible"
+                )
+
+        elif seed is None:
+            raise ValueError("Only seeded simulations can be cached")
+
+        key = get_cache_key(simulation, seed)
+        teams = simulation.get_teams()
+        result = self.load(key, teams)
+
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+
+        if seed is None:
+            result = simulation.simulate()
+
+        else:
+            result = simulation.simulate(random.Random(seed))
+
+        self.store(key, result, teams)
+
+        return result
@@ -0,0 +1,362 @@
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+from batch_bracket import BatchBracketResult, build_tie_scores
+from bracket import BracketResult, TieScore
+from group_tournament import GroupTournamentResult
+from league import LeagueResult
+from monte_carlo import (
+    TeamOutcome, get_chunks, get_run_seed, get_team_outcomes,
+    prepare_outcome_simulation
+)
+from rating_state import RatingState
+from result_cache import get_cache_key
+from simulation import Retention, Simulation, SimulationResult
+from team import Team
+
+STORE_COLUMNS: dict[str, str] = {
+    "run": "<i8",
+    "team": "<i4",
+    "stage": "<i2",
+    "position": "<i2",
+    "points": "<f4",
+    "goals_for": "<i4",
+    "goals_against": "<i4",
+    "elo_delta": "<f4"
+}
+STORE_META = "store.json"
+
+StoreColumns = dict[str, np.ndarray]
+
+
+@dataclass
+class TeamTotals:
+    points: float = 0
+    goals_for: int = 0
+    goals_against: int = 0
+
+
+def add_league_totals(
+        totals: dict[str, TeamTotals], league_result: LeagueResult
+) -> None:
+    for entry in league_result.entries:
+        team_totals = totals.setdefault(entry.state.team.name, TeamTotals())
+        team_totals.points += entry.data.points
+        team_totals.goals_for += entry.data.goals_for
+        team_totals.goals_against += entry.data.goals_against
+
+
+def add_tie_totals(
+        totals: dict[str, TeamTotals], tie_scores: list[TieScore]
+) -> None:
+    for tie_score in tie_scores:
+        winner_totals = totals.setdefault(tie_score.winner.name, TeamTotals())
+        winner_totals.goals_for += tie_score.winner_goals
+        winner_totals.goals_against += tie_score.loser_goals
+
+        loser_totals = totals.setdefault(tie_score.loser.name, TeamTotals())
+        loser_totals.goals_for += tie_score.loser_goals
+        loser_totals.goals_against += tie_score.winner_goals
+
+
+def add_bracket_totals(
+        totals: dict[str, TeamTotals], bracket_result: BracketResult
+) -> None:
+    for round_data in bracket_result.all_round_data:
+        add_tie_totals(totals, round_data.tie_scores)
+
+
+def get_team_totals(result: SimulationResult) -> dict[str, TeamTotals]:
+    totals: dict[str, TeamTotals] = {}
+
+    if isinstance(result, LeagueResult):
+        add_league_totals(totals, result)
+
+    elif isinstance(result, BracketResult):
+        add_bracket_totals(totals, result)
+
+    elif isinstance(result, BatchBracketResult):
+
+        for round_data in result.all_round_data:
+            add_tie_totals(totals, build_tie_scores(result.teams, round_data))
+
+    elif isinstance(result, GroupTournamentResult):
+
+        for group_data in result.all_group_data:
+            add_league_totals(totals, group_data.league_result)
+
+        add_bracket_totals(totals, result.bracket_result)
+
+    return totals
+
+
+def simulate_rows(
+        simulation: Simulation, seed: int, start: int, stop: int
+) -> StoreColumns:
+    teams = simulation.get_teams()
+    row_count = (stop - start) * len(teams)
+    columns = {
+        name: np.zeros(row_count, dtype=dtype)
+        for name, dtype in STORE_COLUMNS.items()
+    }
+    ratings = RatingState()
+    row = 0
+
+    for run in range(start, stop):
+        ratings.reset()
+        rng = random.Random(get_run_seed(seed, run))
+        result = simulation.simulate(rng, ratings)
+        outcomes = get_team_outcomes(result)
+        totals = get_team_totals(result)
+
+        for team_id, team in enumerate(teams):
+            outcome = outcomes.get(team.name, TeamOutcome())
+            team_totals = totals.get(team.name, TeamTotals())
+
+            columns["run"][row] = run
+            columns["team"][row] = team_id
+            columns["stage"][row] = outcome.stage
+            columns["position"][row] = outcome.position
+            columns["points"][row] = team_totals.points
+            columns["goals_for"][row] = team_totals.goals_for
+            columns["goals_against"][row] = team_totals.goals_against
+            columns["elo_delta"][row] = ratings.get_elo_delta(team)
+            row += 1
+
+    return columns
+
+
+def read_store_meta(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, STORE_META)) as meta_file:
+            return json.load(meta_file)
+
+    except FileNotFoundError:
+        return None
+
+
+def write_store_meta(path: str, meta: dict) -> None:
+    meta_path = os.path.join(path, STORE_META)
+    temp_path = f"{meta_path}.tmp"
+
+    with open(temp_path, "w") as meta_file:
+        json.dump(meta, meta_file)
+
+    os.replace(temp_path, meta_path)
+
+
+def get_column_path(path: str, name: str) -> str:
+    return os.path.join(path, f"{name}.bin")
+
+
+class ResultStoreWriter:
+
+    def __init__(
+            self,
+            path: str,
+            teams: list[Team],
+            seed: int,
+            simulation_key: str,
+            retention: Retention
+    ) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta = read_store_meta(path)
+        team_names = [team.name for team in teams]
+        experiment = {
+            "seed": seed,
+            "simulation_key": simulation_key,
+            "retention": retention.value
+        }
+
+        if meta is None:
+            meta = {
+                "columns": STORE_COLUMNS,
+                "teams": team_names,
+                "rows": 0,
+                **experiment
+            }
+            write_store_meta(path, meta)
+
+        elif meta["teams"] != team_names or meta["columns"] != STORE_COLUMNS:
+            raise ValueError(f"{path} holds a store with another layout")
+
+        elif any(meta.get(name) != value for name, value in experiment.items()):
+            raise ValueError(f"{path} holds runs of another experiment")
+
+        self.meta = meta
+        self.files = {}
+
+        for name, dtype in STORE_COLUMNS.items():
+            column_file = open(get_column_path(path, name), "ab")
+            column_file.truncate(meta["rows"] * np.dtype(dtype).itemsize)
+            self.files[name] = column_file
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    def append(self, columns: StoreColumns) -> None:
+        row_count = len(columns["run"])
+
+        for name, dtype in STORE_COLUMNS.items():
+            column = np.asarray(columns[name], dtype=dtype)
+
+            if len(column) != row_count:
+                raise ValueError(f"Column {name} has {len(column)} rows")
+
+            self.files[name].write(column.tobytes())
+
+        for column_file in self.files.values():
+            column_file.flush()
+            os.fsync(column_file.fileno())
+
+        self.meta["rows"] += row_count
+        write_store_meta(self.path, self.meta)
+
+    def close(self) -> None:
+        for column_file in self.files.values():
+            column_file.close()
+
+    def __enter__(self) -> "ResultStoreWriter":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class ResultStore:
+
+    def __init__(self, path: str) -> None:
+        meta = read_store_meta(path)
+
+        if meta is None:
+            raise FileNotFoundError(f"No result store at {path}")
+
+        self.path = path
+        self.teams: list[str] = meta["teams"]
+        self.rows: int = meta["rows"]
+        self.seed: Optional[int] = meta.get("seed")
+        self.simulation_key: Optional[str] = meta.get("simulation_key")
+        self.retention: Optional[Retention] = None
+
+        if "retention" in meta:
+            self.retention = Retention(meta["retention"])
+        self.columns: dict[str, np.ndarray] = {}
+
+        for name, dtype in meta["columns"].items():
+
+            if self.rows:
+                self.columns[name] = np.memmap(
+                    get_column_path(path, name),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(self.rows,)
+                )
+
+            else:
+                self.columns[name] = np.zeros(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def iter_chunks(self, chunk_rows: int = 1 << 22) -> Iterator[StoreColumns]:
+        for start in range(0, self.rows, chunk_rows):
+            yield {
+                name: column[start:start + chunk_rows]
+                for name, column in self.columns.items()
+            }
+
+    def get_team_sums(
+            self, name: str, chunk_rows: int = 1 << 22
+    ) -> np.ndarray:
+        sums = np.zeros(len(self.teams))
+
+        for chunk in self.iter_chunks(chunk_rows):
+            sums += np.bincount(
+                chunk["team"], weights=chunk[name], minlength=len(self.teams)
+            )
+
+        return sums
+
+    def get_team_counts(self, chunk_rows: int = 1 << 22) -> np.ndarray:
+        counts = np.zeros(len(self.teams), dtype=np.int64)
+
+        for chunk in self.iter_chunks(chunk_rows):
+            counts += np.bincount(chunk["team"], minlength=len(self.teams))
+
+        return counts
+
+    def get_team_means(
+            self, name: str, chunk_rows: int = 1 << 22
+    ) -> np.ndarray:
+        counts = self.get_team_counts(chunk_rows)
+        return self.get_team_sums(name, chunk_rows) / np.maximum(counts, 1)
+
+    def get_stage_chances(
+            self, stage: int, chunk_rows: int = 1 << 22
+    ) -> np.ndarray:
+        reached = np.zeros(len(self.teams))
+
+        for chunk in self.iter_chunks(chunk_rows):
+            reached += np.bincount(
+                chunk["team"],
+                weights=chunk["stage"] >= stage,
+                minlength=len(self.teams)
+            )
+
+        return reached / np.maximum(self.get_team_counts(chunk_rows), 1)
+
+
+def simulate_to_store(
+        simulation: Simulation,
+        path: str,
+        runs: int,
+        seed: int = 0,
+        chunk_size: int = 250,
+        workers: Optional[int] = None,
+        retention: Retention = Retention.STANDINGS
+) -> ResultStore:
+    workers = workers or os.cpu_count() or 1
+    simulation = prepare_outcome_simulation(simulation, retention)
+    teams = simulation.get_teams()
+    simulation_key = get_cache_key(simulation)
+
+    with ResultStoreWriter(
+            path, teams, seed, simulation_key, retention
+    ) as writer:
+        start = writer.rows // len(teams)
+        chunks = get_chunks(start, runs, chunk_size)
+
+        if workers == 1:
+
+            for chunk_start, chunk_stop in chunks:
+                writer.append(
+                    simulate_rows(simulation, seed, chunk_start, chunk_stop)
+                )
+
+        else:
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunk_columns = executor.map(
+                    simulate_rows,
+                    [simulation] * len(chunks),
+                    [seed] * len(chunks),
+                    [chunk_start for chunk_start, _ in chunks],
+                    [chunk_stop for _, chunk_stop in chunks]
+                )
+
+                for columns in chunk_columns:
+                    writer.append(columns)
+
+    return ResultStore(path)
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class RoundRobinSchedule:
+    home_ids: tuple[int, ...]
+    away_ids: tuple[int, ...]
+    day_starts: tuple[int, ...]
+
+    @property
+    def day_count(self) -> int:
+        return len(self.day_starts) - 1
+
+    def get_day_fixtures(self, day: int) -> Iterator[tuple[int, int]]:
+        start, stop = self.day_starts[day], self.day_starts[day + 1]
+        return zip(self.home_ids[start:stop], self.away_ids[start:stop])
+
+
+@lru_cache(maxsize=64)
+def get_round_robin_schedule(
+        team_count: int, replays: int = 1
+) -> RoundRobinSchedule:
+    dummy_id = team_count
+
+    home_pool = list(range(team_count // 2))
+    away_pool = list(range(team_count // 2, team_count))[::-1]
+
+    if team_count % 2 == 1:
+        home_pool.append(dummy_id)
+        team_count += 1
+
+    home_ids: list[int] = []
+    away_ids: list[int] = []
+    day_starts: list[int] = [0]
+
+    days = team_count * (replays + 1) - replays - 1
+
+    for i in range(days):
+
+        for home_id, away_id in zip(home_pool, away_pool):
+
+            if i % 2 == 0:
+                home_id, away_id = away_id, home_id
+
+            if home_id != dummy_id and away_id != dummy_id:
+                home_ids.append(home_id)
+                away_ids.append(away_id)
+
+        day_starts.append(len(home_ids))
+
+        away_pool.append(home_pool.pop())
+        home_pool.insert(1, away_pool[0])
+        away_pool.remove(away_pool[0])
+
+    return RoundRobinSchedule(
+        tuple(home_ids), tuple(away_ids), tuple(day_starts)
+    )
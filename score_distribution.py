@@ -0,0 +1,195 @@
+import math
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+TAIL_TOLERANCE = 1e-12
+
+
+@dataclass(frozen=True)
+class MatchOdds:
+    home_win: float
+    draw: float
+    away_win: float
+    score_chances: tuple[tuple[float, ...], ...]
+
+    def get_score_chance(self, home_goals: int, away_goals: int) -> float:
+        if home_goals >= len(self.score_chances):
+            return 0
+
+        home_row = self.score_chances[home_goals]
+        return home_row[away_goals] if away_goals < len(home_row) else 0
+
+
+def get_binomial_chances(
+        trials: int, chance: float, tolerance: float = TAIL_TOLERANCE
+) -> list[float]:
+    if chance <= 0 or trials <= 0:
+        return [1]
+
+    if chance >= 1:
+        return [0] * trials + [1]
+
+    odds = chance / (1 - chance)
+    probability = (1 - chance) ** trials
+    chances = [probability]
+    cumulative = probability
+
+    while 1 - cumulative > tolerance and len(chances) <= trials:
+        successes = len(chances) - 1
+        probability *= odds * (trials - successes) / (successes + 1)
+        chances.append(probability)
+        cumulative += probability
+
+    return chances
+
+
+@lru_cache(maxsize=4096)
+def get_quantized_match_odds(
+        elo_diff: float,
+        elo_weight: float,
+        goals_per_game: float,
+        match_minutes: float
+) -> MatchOdds:
+    home_win_chance = 1 / (10 ** (elo_diff / elo_weight) + 1)
+
+    seconds = int(match_minutes * 60)
+    goals_per_sec = goals_per_game / match_minutes / 60
+    goal_chances = get_binomial_chances(seconds, goals_per_sec)
+
+    score_chances = [[0.0] * len(goal_chances) for _ in goal_chances]
+
+    for goals, goal_chance in enumerate(goal_chances):
+        split_chances = get_binomial_chances(goals, home_win_chance, 0)
+
+        for home_goals, split_chance in enumerate(split_chances):
+            away_goals = goals - home_goals
+            score_chances[home_goals][away_goals] = goal_chance * split_chance
+
+    home_win = draw = away_win = 0
+
+    for home_goals, home_row in enumerate(score_chances):
+
+        for away_goals, score_chance in enumerate(home_row):
+
+            if home_goals > away_goals:
+                home_win += score_chance
+
+            elif home_goals < away_goals:
+                away_win += score_chance
+
+            else:
+                draw += score_chance
+
+    return MatchOdds(
+        home_win, draw, away_win, tuple(tuple(row) for row in score_chances)
+    )
+
+
+@dataclass(frozen=True)
+class ScoreTable:
+    cumulative_chances: tuple[float, ...]
+    scores: tuple[tuple[int, int], ...]
+
+    def sample(self, uniform: float) -> tuple[int, int]:
+        return self.scores[bisect_right(self.cumulative_chances, uniform)]
+
+
+def get_score_order(score: tuple[int, int]) -> tuple[int, int]:
+    home_goals, away_goals = score
+    return home_goals - away_goals, home_goals
+
+
+def build_score_table(match_odds: MatchOdds) -> ScoreTable:
+    scores: list[tuple[float, tuple[int, int]]] = []
+
+    for home_goals, home_row in enumerate(match_odds.score_chances):
+
+        for away_goals, score_chance in enumerate(home_row):
+
+            if score_chance:
+                scores.append((score_chance, (home_goals, away_goals)))
+
+    scores.sort(key=lambda item: get_score_order(item[1]))
+
+    cumulative_chances: list[float] = []
+    cumulative = 0
+
+    for score_chance, _ in scores:
+        cumulative += score_chance
+        cumulative_chances.append(cumulative)
+
+    cumulative_chances[-1] = 1
+
+    return ScoreTable(
+        tuple(cumulative_chances), tuple(score for _, score in scores)
+    )
+
+
+class ScoreSampler:
+
+    def __init__(
+            self,
+            elo_weight: float,
+            goals_per_game: float,
+            match_minutes: float,
+            elo_step: float = 1,
+            max_tables: int = 4096
+    ) -> None:
+        self.elo_weight = elo_weight
+        self.goals_per_game = goals_per_game
+        self.match_minutes = match_minutes
+        self.elo_step = elo_step
+        self.max_tables = max_tables
+
+        self.tables: OrderedDict[int, ScoreTable] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    @property
+    def max_error(self) -> float:
+        split_error = math.log(10) * self.elo_step / (8 * self.elo_weight)
+        return self.goals_per_game * split_error + TAIL_TOLERANCE
+
+    def get_table(self, elo_diff: float) -> ScoreTable:
+        step_count = round(elo_diff / self.elo_step)
+        table = self.tables.get(step_count)
+
+        if table is not None:
+            self.hits += 1
+            self.tables.move_to_end(step_count)
+            return table
+
+        self.misses += 1
+
+        table = build_score_table(get_quantized_match_odds(
+            step_count * self.elo_step,
+            self.elo_weight,
+            self.goals_per_game,
+            self.match_minutes
+        ))
+        self.tables[step_count] = table
+
+        if len(self.tables) > self.max_tables:
+            self.tables.popitem(last=False)
+
+        return table
+
+    def sample(self, elo_diff: float, uniform: float) -> tuple[int, int]:
+        return self.get_table(elo_diff).sample(uniform)
+
+
+@lru_cache(maxsize=None)
+def get_score_sampler(
+        elo_weight: float,
+        goals_per_game: float,
+        match_minutes: float,
+        elo_step: float = 1
+) -> ScoreSampler:
+    return ScoreSampler(elo_weight, goals_per_game, match_minutes, elo_step)
@@ -1,18 +1,111 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
 import requests
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from response_cache import CacheEntry, ResponseCache, get_content_digest
+from team import Team, TeamTable
+
+
+@dataclass
+class ScraperConfig:
+    base_url: str = "http://clubelo.com"
+    workers: int = 8
+    retries: int = 3
+    backoff_factor: float = 0.5
+    timeout: float = 10
+    cache_dir: Optional[str] = None
+    force_refresh: bool = False
+
+
+@dataclass
+class RegionLink:
+    href: str
+    region: str
+
+
+@dataclass
+class ScrapedTeam:
+    name: str
+    elo: float
+    regional_league_rank: int
+
+
+@dataclass
+class ScrapedRegion:
+    scraped_teams: list[ScrapedTeam]
+    digest: str
+    changed: bool = True
+
+
+@dataclass
+class ScrapeResult:
+    teams: list[Team]
+    changed_regions: list[str] = field(default_factory=list)
+    region_digests: dict[str, str] = field(default_factory=dict)
+
+
+def create_session(scraper_config: ScraperConfig) -> requests.Session:
+    retry = Retry(
+        total=scraper_config.retries,
+        backoff_factor=scraper_config.backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504)
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=scraper_config.workers,
+        max_retries=retry
+    )
 
-from team import Team
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
 
+    return session
 
-def scrape_teams_from_web() -> list[Team]:
-    teams: list[Team] = []
 
-    home_link = "http://clubelo.com"
-    home_page = requests.get(home_link)
-    home_soup = BeautifulSoup(home_page.content, "html.parser")
+def fetch_page(
+        session: requests.Session,
+        url: str,
+        scraper_config: ScraperConfig,
+        cache: Optional[ResponseCache] = None
+) -> bytes:
+    cached = None
 
-    print("Collected teams from...")
+    if cache is not None and not scraper_config.force_refresh:
+        cached = cache.load(url)
+
+    headers = cached[0].get_validators() if cached is not None else {}
+
+    response = session.get(
+        url, headers=headers, timeout=scraper_config.timeout
+    )
+
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+
+    response.raise_for_status()
+
+    if cache is not None:
+        cache.store(CacheEntry(
+            url,
+            get_content_digest(response.content),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        ), response.content)
+
+    return response.content
+
+
+def get_region_links(home_content: bytes) -> list[RegionLink]:
+    home_soup = BeautifulSoup(home_content, "html.parser")
+    region_links: list[RegionLink] = []
 
     tag: Tag
 
@@ -20,34 +113,161 @@ def scrape_teams_from_web() -> list[Team]:
 
         if tag.has_attr("colspan"):
             link_tag = tag.find("a")
-            href = link_tag.get("href")
-            region = link_tag.text[1:]
+            region_links.append(
+                RegionLink(link_tag.get("href"), link_tag.text[1:])
+            )
+
+    return region_links
+
+
+def parse_regional_page(
+        regional_content: bytes, region_link: RegionLink
+) -> list[ScrapedTeam]:
+    regional_soup = BeautifulSoup(regional_content, "html.parser")
+    scraped_teams: list[ScrapedTeam] = []
+
+    searching_for_team = False
+    league_rank = 0
+
+    for row_tag in regional_soup.find(class_="liste").find_all("tr"):
+
+        if searching_for_team:
+
+            if row_tag.find("b"):
+                break
+
+            if row_tag.find("i"):
+                league_rank += 1
+
+            else:
+                name = row_tag.find("a").get("href")[1:]
+                elo = int(row_tag.find(class_="r").text)
+                league_rank = max(league_rank, 1)
+                scraped_teams.append(ScrapedTeam(name, elo, league_rank))
+
+        elif row_tag.find("a", attrs={"href": region_link.href}):
+            searching_for_team = True
+
+    return scraped_teams
+
+
+def group_teams_by_region(teams: list[Team]) -> dict[str, list[ScrapedTeam]]:
+    teams_by_region: dict[str, list[ScrapedTeam]] = {}
+
+    for team in teams:
+        teams_by_region.setdefault(team.region, []).append(
+            ScrapedTeam(team.name, team.elo, team.regional_league_rank)
+        )
+
+    return teams_by_region
+
+
+def get_region_digest(
+        regional_content: bytes, scraped_teams: list[ScrapedTeam]
+) -> str:
+    rows = [
+        [team.name, float(team.elo), team.regional_league_rank]
+        for team in scraped_teams
+    ]
+
+    return get_content_digest(regional_content + json.dumps(rows).encode())
+
+
+def scrape_region(
+        session: requests.Session,
+        region_link: RegionLink,
+        scraper_config: ScraperConfig,
+        cache: Optional[ResponseCache] = None,
+        stored_teams: Optional[list[ScrapedTeam]] = None,
+        stored_digest: Optional[str] = None
+) -> ScrapedRegion:
+    regional_content = fetch_page(
+        session,
+        scraper_config.base_url + region_link.href,
+        scraper_config,
+        cache
+    )
+
+    if stored_teams is not None and not scraper_config.force_refresh:
+        digest = get_region_digest(regional_content, stored_teams)
+
+        if digest == stored_digest:
+            return ScrapedRegion(stored_teams, digest, False)
+
+    scraped_teams = parse_regional_page(regional_content, region_link)
+
+    return ScrapedRegion(
+        scraped_teams, get_region_digest(regional_content, scraped_teams)
+    )
+
+
+def refresh_teams(
+        stored_teams: list[Team],
+        scraper_config: ScraperConfig = ScraperConfig(),
+        region_digests: Optional[dict[str, str]] = None
+) -> ScrapeResult:
+    table = TeamTable()
+    cache: Optional[ResponseCache] = None
+
+    if scraper_config.cache_dir is not None:
+        cache = ResponseCache(scraper_config.cache_dir)
+
+    region_digests = region_digests or {}
+    stored_teams_by_region = group_teams_by_region(stored_teams)
+    changed_regions: list[str] = []
+    scraped_digests: dict[str, str] = {}
+
+    with create_session(scraper_config) as session:
+        home_content = fetch_page(
+            session, scraper_config.base_url, scraper_config, cache
+        )
+        region_links = get_region_links(home_content)
+
+        print("Collected teams from...")
+
+        with ThreadPoolExecutor(scraper_config.workers) as executor:
+            scraped_regions = executor.map(
+                lambda region_link: scrape_region(
+                    session,
+                    region_link,
+                    scraper_config,
+                    cache,
+                    stored_teams_by_region.get(region_link.region),
+                    region_digests.get(region_link.region)
+                ),
+                region_links
+            )
+
+            for region_link, scraped_region in zip(
+                    region_links, scraped_regions
+            ):
+
+                for scraped_team in scraped_region.scraped_teams:
+                    table.add_team(
+                        scraped_team.name,
+                        region_link.region,
+                        scraped_team.elo,
+                        scraped_team.regional_league_rank
+                    )
 
-            regional_link = home_link + link_tag.get("href")
-            regional_page = requests.get(regional_link)
-            regional_soup = BeautifulSoup(regional_page.content, "html.parser")
+                scraped_digests[region_link.region] = scraped_region.digest
 
-            searching_for_team = False
-            league_rank = 0
+                if scraped_region.changed:
+                    changed_regions.append(region_link.region)
 
-            for row_tag in regional_soup.find(class_="liste").find_all("tr"):
+                print(region_link.region)
 
-                if searching_for_team:
+    scraped_region_names = {region_link.region for region_link in region_links}
 
-                    if row_tag.find("b"):
-                        print(region)
-                        break
+    for region in stored_teams_by_region:
 
-                    if row_tag.find("i"):
-                        league_rank += 1
+        if region not in scraped_region_names:
+            changed_regions.append(region)
 
-                    else:
-                        name = row_tag.find("a").get("href")[1:]
-                        elo = int(row_tag.find(class_="r").text)
-                        league_rank = max(league_rank, 1)
-                        teams.append(Team(name, region, elo, league_rank))
+    return ScrapeResult(table.get_teams(), changed_regions, scraped_digests)
 
-                elif row_tag.find("a", attrs={"href": href}):
-                    searching_for_team = True
 
-    return teams
+def scrape_teams_from_web(
+        scraper_config: ScraperConfig = ScraperConfig()
+) -> list[Team]:
+    return refresh_teams([], scraper_config).teams
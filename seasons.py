@@ -0,0 +1,88 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from monte_carlo import prepare_simulation
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import TableFormat, format_table
+from simulation import Retention, Simulation, SimulationResult
+from team import Team
+
+
+@dataclass
+class SeasonsResult(SimulationResult):
+    winners: list[Team] = field(default_factory=list)
+    final_elos: dict[str, float] = field(default_factory=dict)
+    season_results: list[SimulationResult] = field(default_factory=list)
+
+    def display(
+            self,
+            limit: Optional[int] = None,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        season_table = [
+            [i + 1, winner.name] for i, winner in enumerate(self.winners)
+        ]
+        elo_table = [
+            [f"{i + 1}. {name}", f"{elo:.1f}"]
+            for i, (name, elo) in enumerate(sorted(
+                self.final_elos.items(), key=lambda item: -item[1]
+            )[:limit])
+        ]
+
+        return "\n".join([
+            format_table(season_table, ["Season", "Winner"], table_format),
+            format_table(elo_table, ["Team", "Elo"], table_format)
+        ])
+
+
+@dataclass
+class Seasons(Simulation):
+    simulation: Simulation
+    seasons: int = 10
+    retention: Retention = Retention.WINNER
+
+    def get_teams(self) -> list[Team]:
+        return self.simulation.get_teams()
+
+    def get_season_simulation(self) -> Simulation:
+        return prepare_simulation(self.simulation, self.retention)
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> SeasonsResult:
+        stream = as_stream(rng)
+        ratings = ratings if ratings is not None else RatingState()
+        season_simulation = self.get_season_simulation()
+        seasons_result = SeasonsResult()
+
+        for _ in range(self.seasons):
+            self.play_season(
+                season_simulation, seasons_result, stream, ratings
+            )
+
+        return self.finish(seasons_result, ratings)
+
+    def play_season(
+            self,
+            season_simulation: Simulation,
+            seasons_result: SeasonsResult,
+            rng: Optional[RandomSource],
+            ratings: RatingState
+    ) -> None:
+        result = season_simulation.simulate(rng, ratings)
+        seasons_result.winners.append(result.winner)
+
+        if self.retention != Retention.WINNER:
+            seasons_result.season_results.append(result)
+
+    def finish(
+            self, seasons_result: SeasonsResult, ratings: RatingState
+    ) -> SeasonsResult:
+        seasons_result.final_elos = {
+            team.name: ratings.get_elo(team) for team in self.get_teams()
+        }
+
+        return seasons_result
@@ -1,5 +1,21 @@
 from abc import abstractmethod
 from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Generator, Iterator, Optional, TextIO
+
+from instrumentation import (
+    InstrumentationReport, InstrumentationSink, instrument, time_stage
+)
+from random_stream import RandomSource, as_stream
+from rating_state import RatingState
+from renderer import LineWriter
+from team import Team
+
+
+class Retention(Enum):
+    FULL = "full"
+    STANDINGS = "standings"
+    WINNER = "winner"
 
 
 @dataclass
@@ -9,10 +25,89 @@ class SimulationResult:
     def display(self) -> str:
         ...
 
+    def render(self, writer: LineWriter, **options: Any) -> None:
+        writer.write_line(self.display(**options))
+
+    def write(self, stream: TextIO, **options: Any) -> None:
+        with time_stage("render"):
+            self.render(LineWriter(stream), **options)
+            stream.write("\n")
+
+
+@dataclass
+class SimulationEvent:
+    pass
+
+
+@dataclass
+class ResultEvent(SimulationEvent):
+    result: SimulationResult
+
+
+EventStream = Generator[SimulationEvent, None, SimulationResult]
+
+
+def run_events(events: EventStream) -> SimulationResult:
+    while True:
+
+        try:
+            next(events)
+
+        except StopIteration as stop:
+            return stop.value
+
 
 @dataclass
 class Simulation:
 
     @abstractmethod
-    def simulate(self) -> SimulationResult:
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> SimulationResult:
+        ...
+
+    def simulate_instrumented(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None,
+            sinks: tuple[InstrumentationSink, ...] = ()
+    ) -> tuple[SimulationResult, InstrumentationReport]:
+        with instrument(*sinks) as instrumentation:
+            stream = as_stream(rng)
+            stream.count_draws()
+
+            with time_stage(type(self).__name__):
+                result = self.simulate(stream, ratings)
+
+        return result, instrumentation.report
+
+    def run(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None,
+            emit_events: bool = False
+    ) -> EventStream:
+        yield from ()
+        return self.simulate(rng, ratings)
+
+    def iter_events(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> Iterator[SimulationEvent]:
+        result = yield from self.run(rng, ratings, True)
+        yield ResultEvent(result)
+
+    @abstractmethod
+    def get_teams(self) -> list[Team]:
         ...
+
+
+@dataclass
+class SeededSimulation(Simulation):
+
+    @property
+    def is_reproducible(self) -> bool:
+        return True
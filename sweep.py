@@ -0,0 +1,345 @@
+import dataclasses
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Optional
+
+from league import LeagueConfig
+from match import MatchConfig, MatchEngine
+from monte_carlo import (
+    TeamAggregate, TeamOutcome, get_base_seed, get_chunks, get_run_seed,
+    get_team_outcomes, merge_aggregates, prepare_outcome_simulation
+)
+from random_stream import RandomSource
+from rating_state import RatingState
+from renderer import TableFormat, format_table
+from simulation import (
+    Retention, SeededSimulation, Simulation, SimulationResult
+)
+from team import Team
+
+SWEEP_METRICS = ("win", "stage", "position", "elo")
+
+
+@dataclass
+class SweepPoint:
+    label: str
+    match_config: MatchConfig
+    league_config: Optional[LeagueConfig] = None
+
+
+@dataclass
+class PairedDelta:
+    runs: int = 0
+    total: float = 0
+    total_squares: float = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.runs if self.runs else 0
+
+    def get_half_width(self, z: float) -> float:
+        if self.runs < 2:
+            return math.inf
+
+        variance = (self.total_squares - self.total * self.mean) / (
+            self.runs - 1
+        )
+
+        return z * math.sqrt(max(variance, 0) / self.runs)
+
+    def add(self, delta: float) -> None:
+        self.runs += 1
+        self.total += delta
+        self.total_squares += delta * delta
+
+    def merge(self, other: "PairedDelta") -> None:
+        self.runs += other.runs
+        self.total += other.total
+        self.total_squares += other.total_squares
+
+
+PointDeltas = dict[str, dict[str, PairedDelta]]
+
+
+def get_metric_values(outcome: TeamOutcome, elo_delta: float) -> list[float]:
+    return [outcome.won, outcome.stage, outcome.position, elo_delta]
+
+
+def build_sweep_grid(
+        match_grid: Optional[dict[str, list[Any]]] = None,
+        league_grid: Optional[dict[str, list[Any]]] = None,
+        match_config: MatchConfig = MatchConfig(),
+        league_config: Optional[LeagueConfig] = None
+) -> list[SweepPoint]:
+    match_grid = match_grid or {}
+    league_grid = league_grid or {}
+
+    if league_grid and league_config is None:
+        league_config = LeagueConfig()
+
+    names = list(match_grid) + list(league_grid)
+    grid_points: list[SweepPoint] = []
+
+    for values in itertools.product(
+            *match_grid.values(), *league_grid.values()
+    ):
+        match_values = dict(zip(match_grid, values))
+        league_values = dict(zip(league_grid, values[len(match_grid):]))
+
+        label = ", ".join(
+            f"{name}={value}" for name, value in zip(names, values)
+        )
+        point_league_config = league_config
+
+        if league_values:
+            point_league_config = dataclasses.replace(
+                league_config, **league_values
+            )
+
+        grid_points.append(SweepPoint(
+            label or "base",
+            dataclasses.replace(match_config, **match_values),
+            point_league_config
+        ))
+
+    return grid_points
+
+
+def apply_sweep_point(
+        simulation: Simulation,
+        sweep_point: SweepPoint,
+        engine: Optional[MatchEngine] = None
+) -> Simulation:
+    match_config = sweep_point.match_config
+
+    if engine is not None:
+        match_config = dataclasses.replace(match_config, engine=engine)
+
+    changes: dict[str, Any] = {"match_config": match_config}
+
+    if sweep_point.league_config is not None:
+        changes["league_config"] = sweep_point.league_config
+
+    return dataclasses.replace(simulation, **changes)
+
+
+def sweep_runs(
+        simulations: list[Simulation],
+        seed: int,
+        start: int,
+        stop: int,
+        base_ratings: Optional[RatingState] = None
+) -> tuple[list[dict[str, TeamAggregate]], list[PointDeltas]]:
+    teams = simulations[0].get_teams()
+    all_aggregates: list[dict[str, TeamAggregate]] = [
+        {team.name: TeamAggregate() for team in teams} for _ in simulations
+    ]
+    all_deltas: list[PointDeltas] = [
+        {
+            team.name: {metric: PairedDelta() for metric in SWEEP_METRICS}
+            for team in teams
+        }
+        for _ in simulations
+    ]
+    base_ratings = (
+        base_ratings if base_ratings is not None else RatingState()
+    )
+    ratings = RatingState()
+
+    for run in range(start, stop):
+        base_values: dict[str, list[float]] = {}
+
+        for i, simulation in enumerate(simulations):
+            ratings.reset()
+            ratings.update(base_ratings)
+            rng = random.Random(get_run_seed(seed, run))
+            outcomes = get_team_outcomes(simulation.simulate(rng, ratings))
+
+            for team in teams:
+                elo_delta = ratings.get_elo(team) - base_ratings.get_elo(team)
+                outcome = outcomes.get(team.name, TeamOutcome())
+                all_aggregates[i][team.name].add(outcome, elo_delta)
+
+                values = get_metric_values(outcome, elo_delta)
+
+                if i == 0:
+                    base_values[team.name] = values
+
+                for metric, value, base_value in zip(
+                        SWEEP_METRICS, values, base_values[team.name]
+                ):
+                    all_deltas[i][team.name][metric].add(value - base_value)
+
+    return all_aggregates, all_deltas
+
+
+def merge_sweep_outputs(
+        all_aggregates: list[dict[str, TeamAggregate]],
+        all_deltas: list[PointDeltas],
+        other_aggregates: list[dict[str, TeamAggregate]],
+        other_deltas: list[PointDeltas]
+) -> None:
+    for aggregates, other in zip(all_aggregates, other_aggregates):
+        merge_aggregates(aggregates, other)
+
+    for deltas, other in zip(all_deltas, other_deltas):
+
+        for name, team_deltas in other.items():
+
+            for metric, paired_delta in team_deltas.items():
+                deltas[name][metric].merge(paired_delta)
+
+
+def merge_chunk_outputs(
+        chunk_outputs: Any
+) -> tuple[list[dict[str, TeamAggregate]], list[PointDeltas]]:
+    all_aggregates: list[dict[str, TeamAggregate]] = []
+    all_deltas: list[PointDeltas] = []
+
+    for aggregates, deltas in chunk_outputs:
+
+        if not all_aggregates:
+            all_aggregates, all_deltas = aggregates, deltas
+
+        else:
+            merge_sweep_outputs(all_aggregates, all_deltas, aggregates, deltas)
+
+    return all_aggregates, all_deltas
+
+
+@dataclass
+class SweepResult(SimulationResult):
+    runs: int
+    labels: list[str]
+    all_aggregates: list[dict[str, TeamAggregate]] = field(
+        default_factory=list
+    )
+    all_deltas: list[PointDeltas] = field(default_factory=list)
+    confidence: float = 0.95
+
+    def format_delta(
+            self, paired_delta: PairedDelta, z: float, scale: float = 1
+    ) -> str:
+        half_width = paired_delta.get_half_width(z)
+        return f"{scale * paired_delta.mean:+.2f} ± {scale * half_width:.2f}"
+
+    def display(
+            self,
+            limit: Optional[int] = None,
+            table_format: TableFormat = TableFormat.FANCY_GRID
+    ) -> str:
+        z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        base_aggregates = self.all_aggregates[0]
+        names = sorted(
+            base_aggregates,
+            key=lambda name: (
+                -base_aggregates[name].wins,
+                -base_aggregates[name].mean_elo_delta
+            )
+        )[:limit]
+
+        uses_positions = any(
+            aggregate.position_counts for aggregate in base_aggregates.values()
+        )
+        rank_metric = "position" if uses_positions else "stage"
+
+        output = [
+            f"{self.runs} RUNS, BASE {self.labels[0]}, "
+            f"{100 * self.confidence:g}% CONFIDENCE"
+        ]
+
+        for label, aggregates, deltas in zip(
+                self.labels[1:], self.all_aggregates[1:], self.all_deltas[1:]
+        ):
+            table: list[list[str]] = []
+
+            for name in names:
+                table.append([
+                    name,
+                    f"{100 * base_aggregates[name].win_chance:.2f}%",
+                    f"{100 * aggregates[name].win_chance:.2f}%",
+                    self.format_delta(deltas[name]["win"], z, 100),
+                    self.format_delta(deltas[name][rank_metric], z),
+                    self.format_delta(deltas[name]["elo"], z)
+                ])
+
+            headers = [
+                "Team", "Base Win", "Win", "ΔWin %",
+                f"Δ{rank_metric.capitalize()}", "ΔElo"
+            ]
+            output.append("")
+            output.append(label)
+            output.append(format_table(table, headers, table_format))
+
+        return "\n".join(output)
+
+
+@dataclass
+class SweepConfig:
+    runs: int = 1000
+    workers: Optional[int] = None
+    seed: int = 0
+    chunk_size: int = 250
+    confidence: float = 0.95
+    engine: Optional[MatchEngine] = MatchEngine.LOOKUP
+    retention: Retention = Retention.STANDINGS
+
+
+@dataclass
+class Sweep(SeededSimulation):
+    simulation: Simulation
+    sweep_points: list[SweepPoint] = field(default_factory=list)
+    sweep_config: SweepConfig = SweepConfig()
+
+    def get_teams(self) -> list[Team]:
+        return self.simulation.get_teams()
+
+    def simulate(
+            self,
+            rng: Optional[RandomSource] = None,
+            ratings: Optional[RatingState] = None
+    ) -> SweepResult:
+        config = self.sweep_config
+        workers = config.workers or os.cpu_count() or 1
+        seed = get_base_seed(config.seed, rng)
+        simulation = prepare_outcome_simulation(
+            self.simulation, config.retention
+        )
+        simulations = [
+            apply_sweep_point(simulation, sweep_point, config.engine)
+            for sweep_point in self.sweep_points
+        ]
+        chunks = get_chunks(0, config.runs, config.chunk_size)
+
+        if workers == 1:
+            chunk_outputs = [
+                sweep_runs(simulations, seed, start, stop, ratings)
+                for start, stop in chunks
+            ]
+            all_aggregates, all_deltas = merge_chunk_outputs(chunk_outputs)
+
+        else:
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                all_aggregates, all_deltas = merge_chunk_outputs(executor.map(
+                    sweep_runs,
+                    [simulations] * len(chunks),
+                    [seed] * len(chunks),
+                    [start for start, _ in chunks],
+                    [stop for _, stop in chunks],
+                    [ratings] * len(chunks)
+                ))
+
+        return SweepResult(
+            config.runs,
+            [sweep_point.label for sweep_point in self.sweep_points],
+            all_aggregates,
+            all_deltas,
+            config.confidence
+        )
+
@@ -1,20 +1,314 @@
+import hashlib
+import mmap
+import os
+import struct
+import uuid
+from array import array
 from dataclasses import dataclass
+from typing import Iterator, Optional
+from weakref import WeakValueDictionary
+
+SNAPSHOT_MAGIC = b"TEAMSNP1"
+SNAPSHOT_HEADER = struct.Struct("<8sI32sqq4x")
 
 
 @dataclass
+class TeamSnapshotHeader:
+    team_count: int
+    source_digest: bytes
+    source_mtime_ns: int
+    source_size: int
+
+
+class StringTable:
+
+    def __init__(self, offsets: memoryview, data: memoryview) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return str(self.data[start:stop], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+
+def encode_strings(strings: list[str]) -> tuple[array, bytes]:
+    offsets = array("I", [0])
+    encoded: list[bytes] = []
+
+    for string in strings:
+        encoded.append(string.encode("utf-8"))
+        offsets.append(offsets[-1] + len(encoded[-1]))
+
+    return offsets, b"".join(encoded)
+
+
+class TeamTable:
+
+    def __init__(self) -> None:
+        self.uid = uuid.uuid4().hex
+        self.names: list[str] = []
+        self.regions: list[str] = []
+        self.elos = array("d")
+        self.regional_league_ranks = array("i")
+        self.dummies = array("b")
+        self.snapshot_path: Optional[str] = None
+        self.snapshot_digest: Optional[bytes] = None
+        self.teams: list[Team] = []
+
+        TEAM_TABLES[self.uid] = self
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def add_team(
+            self,
+            name: str,
+            region: str,
+            elo: float,
+            regional_league_rank: int,
+            dummy: bool = False
+    ) -> "Team":
+
+        if self.snapshot_path is not None:
+            self.detach_snapshot()
+
+        self.names.append(name)
+        self.regions.append(region)
+        self.elos.append(elo)
+        self.regional_league_ranks.append(regional_league_rank)
+        self.dummies.append(dummy)
+
+        return self.add_view()
+
+    def add_view(self) -> "Team":
+        team = object.__new__(Team)
+        team.table, team.id = self, len(self.teams)
+        name_key = (team.name, team.region)
+        team.key = TEAM_KEYS.setdefault(name_key, len(TEAM_KEYS))
+        team.key_hash = hash(name_key)
+        self.teams.append(team)
+
+        return team
+
+    def get_team(self, team_id: int) -> "Team":
+        return self.teams[team_id]
+
+    def get_teams(self) -> list["Team"]:
+        return list(self.teams)
+
+    def detach_snapshot(self) -> None:
+        self.names = list(self.names)
+        self.regions = list(self.regions)
+        self.elos = array("d", self.elos)
+        self.regional_league_ranks = array("i", self.regional_league_ranks)
+        self.dummies = array("b", self.dummies)
+        self.snapshot_path = None
+        self.snapshot_digest = None
+
+    def write_snapshot(self, path: str, header: TeamSnapshotHeader) -> None:
+        name_offsets, name_data = encode_strings(list(self.names))
+        region_offsets, region_data = encode_strings(list(self.regions))
+        region_offsets = array(
+            "I", [offset + len(name_data) for offset in region_offsets]
+        )
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC,
+                len(self),
+                header.source_digest,
+                header.source_mtime_ns,
+                header.source_size
+            ))
+            snapshot_file.write(array("d", self.elos).tobytes())
+            snapshot_file.write(
+                array("i", self.regional_league_ranks).tobytes()
+            )
+            snapshot_file.write(name_offsets.tobytes())
+            snapshot_file.write(region_offsets.tobytes())
+            snapshot_file.write(array("b", self.dummies).tobytes())
+            snapshot_file.write(name_data)
+            snapshot_file.write(region_data)
+
+        os.replace(temp_path, path)
+
+    def __reduce__(self) -> tuple:
+
+        if self.snapshot_path is not None:
+            state = {
+                "uid": self.uid,
+                "snapshot_path": self.snapshot_path,
+                "snapshot_digest": self.snapshot_digest,
+                "elos": array("d", self.elos)
+            }
+
+        else:
+            state = self.__dict__.copy()
+            del state["teams"]
+
+        return load_team_table, (state,)
+
+
+TEAM_TABLES: "WeakValueDictionary[str, TeamTable]" = WeakValueDictionary()
+TEAM_KEYS: dict[tuple[str, str], int] = {}
+
+
+def read_snapshot_header(path: str) -> Optional[TeamSnapshotHeader]:
+    try:
+        with open(path, "rb") as snapshot_file:
+            header_bytes = snapshot_file.read(SNAPSHOT_HEADER.size)
+
+    except OSError:
+        return None
+
+    if len(header_bytes) < SNAPSHOT_HEADER.size:
+        return None
+
+    magic, team_count, digest, mtime_ns, size = SNAPSHOT_HEADER.unpack(
+        header_bytes
+    )
+
+    if magic != SNAPSHOT_MAGIC:
+        return None
+
+    return TeamSnapshotHeader(team_count, digest, mtime_ns, size)
+
+
+def map_team_snapshot(path: str, uid: Optional[str] = None) -> TeamTable:
+    with open(path, "rb") as snapshot_file:
+        buffer = mmap.mmap(
+            snapshot_file.fileno(), 0, access=mmap.ACCESS_COPY
+        )
+
+    view = memoryview(buffer)
+    magic, team_count, _, _, _ = SNAPSHOT_HEADER.unpack_from(view)
+
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a team snapshot")
+
+    elos_start = SNAPSHOT_HEADER.size
+    ranks_start = elos_start + 8 * team_count
+    name_offsets_start = ranks_start + 4 * team_count
+    region_offsets_start = name_offsets_start + 4 * (team_count + 1)
+    dummies_start = region_offsets_start + 4 * (team_count + 1)
+    strings_start = dummies_start + team_count
+
+    table = TeamTable.__new__(TeamTable)
+    table.uid = uid if uid is not None else uuid.uuid4().hex
+    table.elos = view[elos_start:ranks_start].cast("d")
+    ranks = view[ranks_start:name_offsets_start]
+    table.regional_league_ranks = ranks.cast("i")
+    name_offsets = view[name_offsets_start:region_offsets_start].cast("I")
+    region_offsets = view[region_offsets_start:dummies_start].cast("I")
+    table.dummies = view[dummies_start:strings_start].cast("b")
+    string_data = view[strings_start:]
+    table.names = StringTable(name_offsets, string_data)
+    table.regions = StringTable(region_offsets, string_data)
+    table.snapshot_path = path
+    table.snapshot_digest = hashlib.sha256(view[ranks_start:]).digest()
+    table.teams = []
+
+    for _ in range(team_count):
+        table.add_view()
+
+    TEAM_TABLES[table.uid] = table
+
+    return table
+
+
+def load_team_table(state: dict) -> TeamTable:
+    table = TEAM_TABLES.get(state["uid"])
+
+    if table is None and state.get("snapshot_path") is not None:
+        table = map_team_snapshot(state["snapshot_path"], state["uid"])
+
+        if table.snapshot_digest != state["snapshot_digest"]:
+            del TEAM_TABLES[table.uid]
+            raise ValueError(f"{table.snapshot_path} changed since pickling")
+
+        table.elos = state["elos"]
+
+    elif table is None:
+        table = TeamTable.__new__(TeamTable)
+        table.__dict__.update(state)
+        table.teams = []
+
+        for _ in table.names:
+            table.add_view()
+
+        TEAM_TABLES[table.uid] = table
+
+    return table
+
+
 class Team:
-    name: str
-    region: str
-    elo: float
-    regional_league_rank: int
-    dummy: bool = False
+    __slots__ = ("table", "id", "key", "key_hash")
+
+    table: TeamTable
+    id: int
+    key: int
+    key_hash: int
+
+    def __new__(
+            cls,
+            name: str,
+            region: str,
+            elo: float,
+            regional_league_rank: int,
+            dummy: bool = False,
+            table: Optional[TeamTable] = None
+    ) -> "Team":
+        table = table if table is not None else TeamTable()
+        return table.add_team(name, region, elo, regional_league_rank, dummy)
+
+    def __reduce__(self) -> tuple:
+        return TeamTable.get_team, (self.table, self.id)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Team):
+            return NotImplemented
+
+        return self is other or (
+            self.name == other.name and self.region == other.region
+        )
 
     def __hash__(self) -> int:
-        return hash(self.name)
+        return self.key_hash
+
+    @property
+    def name(self) -> str:
+        return self.table.names[self.id]
+
+    @property
+    def region(self) -> str:
+        return self.table.regions[self.id]
+
+    @property
+    def elo(self) -> float:
+        return self.table.elos[self.id]
+
+    @elo.setter
+    def elo(self, elo: float) -> None:
+        self.table.elos[self.id] = elo
+
+    @property
+    def regional_league_rank(self) -> int:
+        return self.table.regional_league_ranks[self.id]
 
+    @property
+    def dummy(self) -> bool:
+        return bool(self.table.dummies[self.id])
 
-def create_dummy(dummy_id: int = 0) -> Team:
-    return Team(f"Dummy {dummy_id}", "", 0, 0, True)
+    def __repr__(self) -> str:
+        return f"Team({self.name!r}, {self.region!r}, {self.elo!r})"
 
 
 @dataclass
@@ -0,0 +1,272 @@
+import hashlib
+import random
+import os
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import NormalDist
+from typing import Iterator
+
+import pytest
+
+from league import League
+from match import MatchConfig, MatchEngine, play_match
+from rating_state import RatingState
+from team import Team, TeamTable
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "clubelo")
+GATHER_TIMEOUT = 5
+MATCHES = 4000
+MIN_P_VALUE = 0.001
+
+
+def create_teams(elos: list[float]) -> list[Team]:
+    table = TeamTable()
+    return [
+        table.add_team(f"Team {i}", "Test", elo, 1)
+        for i, elo in enumerate(elos)
+    ]
+
+
+def create_league(team_count: int) -> League:
+    return League(create_teams([1500 + 50 * i for i in range(team_count)]))
+
+
+def write_teams_csv(path: str, rows: list[tuple[str, float]]) -> None:
+    with open(path, "w") as csv_file:
+        csv_file.write("Name,Region,Elo,Regional League Rank\n")
+
+        for name, elo in rows:
+            csv_file.write(f"{name},Test,{elo},1\n")
+
+
+def get_rows(teams: list[Team]) -> list[tuple]:
+    return [
+        (team.name, team.region, team.elo, team.regional_league_rank)
+        for team in teams
+    ]
+
+
+def sample_scores(
+        engine: MatchEngine, elo_gap: float, seed: int
+) -> Counter:
+    home_team = Team("Home", "Test", 1500 + elo_gap, 0)
+    away_team = Team("Away", "Test", 1500, 0)
+    match_config = MatchConfig(engine=engine, dynamic_elo=False)
+    uniform = random.Random(seed).random
+    ratings = RatingState()
+
+    return Counter(
+        play_match(home_team, away_team, match_config, uniform, ratings)[:2]
+        for _ in range(MATCHES)
+    )
+
+
+def get_outcome_counts(scores: Counter) -> Counter:
+    outcomes: Counter = Counter()
+
+    for (home_goals, away_goals), count in scores.items():
+        outcome = (home_goals > away_goals) - (home_goals < away_goals)
+        outcomes[outcome] += count
+
+    return outcomes
+
+
+def get_p_value(counts: Counter, other_counts: Counter) -> float:
+    total, other_total = sum(counts.values()), sum(other_counts.values())
+    categories = sorted(
+        set(counts) | set(other_counts),
+        key=lambda category: -(counts[category] + other_counts[category])
+    )
+
+    pooled: list[tuple[int, int]] = []
+    rare = [0, 0]
+
+    for category in categories:
+        count, other_count = counts[category], other_counts[category]
+
+        if count + other_count < 10:
+            rare[0] += count
+            rare[1] += other_count
+
+        else:
+            pooled.append((count, other_count))
+
+    if sum(rare) >= 10:
+        pooled.append((rare[0], rare[1]))
+
+    statistic = 0.0
+
+    for count, other_count in pooled:
+        combined = count + other_count
+        expected = combined * total / (total + other_total)
+        other_expected = combined * other_total / (total + other_total)
+        statistic += (count - expected) ** 2 / expected
+        statistic += (other_count - other_expected) ** 2 / other_expected
+
+    degrees = len(pooled) - 1
+    spread = 2 / (9 * degrees)
+    z = ((statistic / degrees) ** (1 / 3) - (1 - spread)) / spread ** 0.5
+
+    return 1 - NormalDist().cdf(z)
+
+
+def read_fixture_pages() -> dict[str, bytes]:
+    pages: dict[str, bytes] = {}
+
+    for file_name in sorted(os.listdir(FIXTURE_DIR)):
+        with open(os.path.join(FIXTURE_DIR, file_name), "rb") as page_file:
+            content = page_file.read()
+
+        if file_name == "index.html":
+            pages["/"] = content
+
+        else:
+            pages["/" + file_name.removesuffix(".html")] = content
+
+    return pages
+
+
+class FixtureServer:
+
+    def __init__(self) -> None:
+        self.pages = read_fixture_pages()
+        self.modified = {path: 1_700_000_000.0 for path in self.pages}
+        self.failures: dict[str, int] = {}
+        self.delays: dict[str, float] = {}
+        self.send_etags = True
+        self.send_last_modified = True
+        self.gather_paths: set[str] = set()
+        self.requests: list[tuple[str, int]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.gathered = 0
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+                server.handle(self)
+
+            def log_message(self, *_: object) -> None:
+                pass
+
+        self.http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(
+            target=self.http_server.serve_forever, daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.http_server.server_port}"
+
+    def get_statuses(self, path: str) -> list[int]:
+        return [
+            status for request_path, status in self.requests
+            if request_path == path
+        ]
+
+    def update_page(self, path: str, content: bytes) -> None:
+        self.pages[path] = content
+        self.modified[path] += 86400
+
+    def gather(self, path: str) -> None:
+        with self.condition:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+            if path in self.gather_paths:
+                self.gathered += 1
+                self.condition.notify_all()
+                self.condition.wait_for(
+                    lambda: self.gathered >= len(self.gather_paths),
+                    timeout=GATHER_TIMEOUT
+                )
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        path = handler.path
+        self.gather(path)
+
+        try:
+            self.respond(handler, path)
+
+        finally:
+
+            with self.lock:
+                self.in_flight -= 1
+
+    def respond(self, handler: BaseHTTPRequestHandler, path: str) -> None:
+        time.sleep(self.delays.get(path, 0))
+
+        with self.lock:
+            failures = self.failures.get(path, 0)
+
+            if failures:
+                self.failures[path] = failures - 1
+
+        if path not in self.pages:
+            status = 404
+
+        elif failures:
+            status = 503
+
+        else:
+            status = 200
+
+        content = self.pages.get(path, b"")
+        etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        last_modified = formatdate(self.modified.get(path, 0), usegmt=True)
+
+        if status == 200:
+            if_none_match = handler.headers.get("If-None-Match")
+            if_modified_since = handler.headers.get("If-Modified-Since")
+
+            if self.send_etags and if_none_match is not None:
+
+                if if_none_match == etag:
+                    status = 304
+
+            elif self.send_last_modified and if_modified_since == last_modified:
+                status = 304
+
+        with self.lock:
+            self.requests.append((path, status))
+
+        handler.send_response(status)
+
+        if status in (200, 304):
+
+            if self.send_etags:
+                handler.send_header("ETag", etag)
+
+            if self.send_last_modified:
+                handler.send_header("Last-Modified", last_modified)
+
+        body = content if status == 200 else b""
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+
+@pytest.fixture
+def fixture_server() -> Iterator[FixtureServer]:
+    server = FixtureServer()
+    server.start()
+
+    try:
+        yield server
+
+    finally:
+        server.stop()
@@ -0,0 +1,76 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from batch_match import get_home_win_chances, simulate_matches, simulate_rounds
+from conftest import (
+    MATCHES, MIN_P_VALUE, create_teams, get_outcome_counts, get_p_value,
+    sample_scores
+)
+from match import MatchConfig, MatchEngine, update_elo
+from rating_state import RatingState
+
+ELO_GAPS = (0, 150, 400)
+
+
+def sample_batch_scores(elo_gap: float, seed: int) -> Counter:
+    result = simulate_matches(
+        np.full(MATCHES, 1500 + elo_gap),
+        np.full(MATCHES, 1500),
+        MatchConfig(dynamic_elo=False),
+        np.random.default_rng(seed)
+    )
+
+    assert np.array_equal(
+        result.outcomes, np.sign(result.home_goals - result.away_goals)
+    )
+
+    return Counter(zip(
+        result.home_goals.tolist(), result.away_goals.tolist()
+    ))
+
+
+@pytest.mark.parametrize("elo_gap", ELO_GAPS)
+def test_batch_matches_scalar_distribution(elo_gap: float) -> None:
+    batch_scores = sample_batch_scores(elo_gap, 1)
+    scalar_scores = sample_scores(MatchEngine.BINOMIAL, elo_gap, 2)
+
+    assert get_p_value(batch_scores, scalar_scores) > MIN_P_VALUE
+    assert get_p_value(
+        get_outcome_counts(batch_scores), get_outcome_counts(scalar_scores)
+    ) > MIN_P_VALUE
+
+
+def test_rounds_feed_elo_forward_like_scalar_matches() -> None:
+    teams = create_teams([1400, 1500, 1600, 1700])
+    home_ids = np.array([[0, 2], [0, 1], [3, 0], [1, 3]])
+    away_ids = np.array([[1, 3], [2, 3], [1, 2], [0, 2]])
+    match_config = MatchConfig()
+    result = simulate_rounds(
+        [team.elo for team in teams],
+        home_ids,
+        away_ids,
+        match_config,
+        np.random.default_rng(1)
+    )
+    ratings = RatingState()
+
+    for i, j in np.ndindex(home_ids.shape):
+        home_team, away_team = teams[home_ids[i, j]], teams[away_ids[i, j]]
+        home_win_chance = get_home_win_chances(
+            ratings.get_elo(home_team), ratings.get_elo(away_team),
+            match_config
+        )
+        home_elo_gain = update_elo(
+            home_team, away_team, match_config, ratings,
+            int(result.home_goals[i, j]), int(result.away_goals[i, j]),
+            float(home_win_chance)
+        )
+
+        assert result.home_elo_gains[i, j] == pytest.approx(home_elo_gain)
+
+    assert result.final_elos == pytest.approx(
+        [ratings.get_elo(team) for team in teams]
+    )
+    assert np.any(result.home_elo_gains != 0)
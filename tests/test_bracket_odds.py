@@ -0,0 +1,62 @@
+import pytest
+
+from batch_bracket import BatchBracket
+from bracket import Bracket, BracketConfig
+from bracket_odds import solve_bracket
+from conftest import create_teams
+from match import MatchConfig
+from monte_carlo import MonteCarlo, MonteCarloConfig
+
+RUNS = 4000
+TOLERANCE = 0.03
+
+
+@pytest.mark.parametrize("elos", [
+    [1900, 1500, 1700, 1600, 1800, 1400, 1650, 1550],
+    [1800, 1500, 1700, 1450, 1600, 1750]
+])
+def test_exact_odds_agree_with_monte_carlo(elos: list[float]) -> None:
+    bracket = Bracket(
+        create_teams(elos),
+        match_config=MatchConfig(dynamic_elo=False),
+        bracket_config=BracketConfig(shuffle_teams=False)
+    )
+    odds = solve_bracket(bracket)
+    result = MonteCarlo(
+        bracket, MonteCarloConfig(runs=RUNS, workers=1, seed=5)
+    ).simulate()
+
+    for team_id, team in enumerate(bracket.teams):
+        aggregate = result.aggregates[team.name]
+
+        for stage, chances in enumerate(odds.round_chances, 1):
+            assert aggregate.get_stage_chance(stage) == pytest.approx(
+                chances[team_id], abs=TOLERANCE
+            )
+
+        assert aggregate.win_chance == pytest.approx(
+            odds.get_win_chance(team), abs=TOLERANCE
+        )
+
+
+def test_batch_bracket_odds_agree_with_monte_carlo() -> None:
+    teams = create_teams([1900, 1500, 1700, 1600, 1800, 1400])
+    match_config = MatchConfig(dynamic_elo=False)
+    bracket_config = BracketConfig(shuffle_teams=False)
+    odds = solve_bracket(Bracket(
+        teams, match_config=match_config, bracket_config=bracket_config
+    ))
+    result = MonteCarlo(
+        BatchBracket(
+            teams, match_config=match_config, bracket_config=bracket_config
+        ),
+        MonteCarloConfig(runs=RUNS, workers=1, seed=5)
+    ).simulate()
+
+    for team_id, team in enumerate(teams):
+        aggregate = result.aggregates[team.name]
+
+        for stage, chances in enumerate(odds.round_chances, 1):
+            assert aggregate.get_stage_chance(stage) == pytest.approx(
+                chances[team_id], abs=TOLERANCE
+            )
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from checkpoint import (
+    load_checkpoint, merge_checkpoints, simulate_monte_carlo, simulate_seasons
+)
+from conftest import create_league
+from league import League, LeagueResult
+from monte_carlo import MonteCarlo, MonteCarloConfig
+from seasons import Seasons
+from simulation import Retention
+
+
+def create_monte_carlo(league: League, **options) -> MonteCarlo:
+    return MonteCarlo(league, MonteCarloConfig(
+        **{"runs": 200, "workers": 1, "seed": 3, "chunk_size": 50, **options}
+    ))
+
+
+def get_counts(aggregates: dict) -> dict:
+    return {
+        name: (aggregate.runs, aggregate.wins, aggregate.position_counts)
+        for name, aggregate in aggregates.items()
+    }
+
+
+def test_resumed_monte_carlo_matches_uninterrupted(tmp_path) -> None:
+    league = create_league(6)
+    path = str(tmp_path / "checkpoint")
+    expected = create_monte_carlo(league).simulate()
+
+    simulate_monte_carlo(create_monte_carlo(league, runs=75), path)
+    resumed = simulate_monte_carlo(create_monte_carlo(league), path)
+
+    assert resumed.runs == expected.runs
+    assert resumed.aggregates == expected.aggregates
+
+
+def test_resume_keeps_the_checkpointed_chunk_size(tmp_path) -> None:
+    league = create_league(6)
+    path = str(tmp_path / "checkpoint")
+    expected = create_monte_carlo(league).simulate()
+
+    simulate_monte_carlo(create_monte_carlo(league, runs=70), path)
+    resumed = simulate_monte_carlo(
+        create_monte_carlo(league, chunk_size=40), path
+    )
+
+    assert load_checkpoint(path).run_ranges == [(0, 200)]
+    assert get_counts(resumed.aggregates) == get_counts(expected.aggregates)
+
+
+@pytest.mark.parametrize("options", [
+    {"runs": 100},
+    {"runs": 100, "first_run": 500}
+])
+def test_resume_refuses_runs_outside_the_request(
+        tmp_path, options: dict
+) -> None:
+    league = create_league(6)
+    path = str(tmp_path / "checkpoint")
+    simulate_monte_carlo(create_monte_carlo(league), path)
+
+    with pytest.raises(ValueError, match="holds runs outside"):
+        simulate_monte_carlo(create_monte_carlo(league, **options), path)
+
+
+def test_shard_checkpoints_merge(tmp_path) -> None:
+    league = create_league(6)
+    paths = [str(tmp_path / "first"), str(tmp_path / "second")]
+    expected = create_monte_carlo(league).simulate()
+
+    simulate_monte_carlo(create_monte_carlo(league, runs=120), paths[0])
+    simulate_monte_carlo(
+        create_monte_carlo(league, runs=80, first_run=120, chunk_size=30),
+        paths[1]
+    )
+    merged = merge_checkpoints(paths).to_result()
+
+    assert merged.runs == 200
+    assert get_counts(merged.aggregates) == get_counts(expected.aggregates)
+
+    with pytest.raises(ValueError, match="already checkpointed"):
+        merge_checkpoints([paths[0], paths[0]])
+
+
+def test_resumed_seasons_match_uninterrupted(tmp_path, monkeypatch) -> None:
+    seasons = Seasons(create_league(6), seasons=5)
+    path = str(tmp_path / "checkpoint")
+    expected = seasons.simulate(random.Random(9))
+    play_season = seasons.play_season
+    played: list[int] = []
+
+    def crash_on_fourth_season(*args) -> None:
+        played.append(len(played))
+
+        if len(played) == 4:
+            raise KeyboardInterrupt
+
+        play_season(*args)
+
+    monkeypatch.setattr(seasons, "play_season", crash_on_fourth_season)
+
+    with pytest.raises(KeyboardInterrupt):
+        simulate_seasons(seasons, 9, path, interval=0)
+
+    monkeypatch.undo()
+
+    assert load_checkpoint(path).season == 3
+
+    resumed = simulate_seasons(seasons, 9, path)
+
+    assert resumed.winners == expected.winners
+    assert resumed.final_elos == expected.final_elos
+    assert resumed.season_results == []
+
+
+def test_seasons_pass_retention_to_each_season() -> None:
+    seasons = Seasons(create_league(6), 2, Retention.STANDINGS)
+    result = seasons.simulate(random.Random(1))
+
+    assert len(result.season_results) == 2
+
+    for season_result in result.season_results:
+        assert isinstance(season_result, LeagueResult)
+        assert season_result.entries
+        assert not season_result.match_results_per_day
@@ -0,0 +1,59 @@
+import random
+from typing import Callable
+
+import pytest
+
+from bracket import Bracket, fold_bracket_events
+from conftest import create_teams
+from group_tournament import (
+    GroupConfig, GroupTournament, fold_group_tournament_events
+)
+from league import League, fold_league_events
+from simulation import Retention, Simulation, SimulationEvent, SimulationResult
+
+ELOS = [1400 + 25 * i for i in range(12)]
+
+
+@pytest.mark.parametrize("retention", list(Retention))
+@pytest.mark.parametrize("create_simulation, fold, display_options", [
+    (
+        lambda retention: League(create_teams(ELOS), retention=retention),
+        fold_league_events,
+        {"show_elo": True, "show_matches": True}
+    ),
+    (
+        lambda retention: Bracket(create_teams(ELOS), retention=retention),
+        fold_bracket_events,
+        {"show_elo": True}
+    ),
+    (
+        lambda retention: GroupTournament(
+            create_teams(ELOS), group_config=GroupConfig(4, 2),
+            retention=retention
+        ),
+        fold_group_tournament_events,
+        {"show_elo": True, "show_group_matches": True}
+    ),
+    (
+        lambda retention: GroupTournament(
+            create_teams(ELOS), group_config=GroupConfig(4, 2, workers=2),
+            retention=retention
+        ),
+        fold_group_tournament_events,
+        {"show_elo": True, "show_group_matches": True}
+    )
+])
+def test_folded_events_match_simulate(
+        create_simulation: Callable[[Retention], Simulation],
+        fold: Callable[[list[SimulationEvent]], SimulationResult],
+        display_options: dict,
+        retention: Retention
+) -> None:
+    simulation = create_simulation(retention)
+    folded = fold(simulation.iter_events(random.Random(3)))
+    result = simulation.simulate(random.Random(3))
+
+    assert folded == result
+    assert folded.display(**display_options) == result.display(
+        **display_options
+    )
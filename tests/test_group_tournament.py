@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from conftest import create_teams
+from group_tournament import (
+    GroupConfig, GroupTournament, fold_group_tournament_events
+)
+from rating_state import RatingState
+from simulation import Retention
+
+
+def create_tournament(workers: int, retention: Retention) -> GroupTournament:
+    return GroupTournament(
+        create_teams([1400 + 25 * i for i in range(16)]),
+        group_config=GroupConfig(4, 2, workers=workers),
+        retention=retention
+    )
+
+
+@pytest.mark.parametrize("retention", [Retention.FULL, Retention.STANDINGS])
+def test_parallel_groups_match_sequential_groups(
+        retention: Retention
+) -> None:
+    sequential = create_tournament(1, retention)
+    parallel = create_tournament(3, retention)
+    sequential_ratings, parallel_ratings = RatingState(), RatingState()
+
+    expected = sequential.simulate(random.Random(5), sequential_ratings)
+    result = parallel.simulate(random.Random(5), parallel_ratings)
+    folded = fold_group_tournament_events(
+        parallel.iter_events(random.Random(5))
+    )
+    display_options = {"show_elo": True, "show_group_matches": True}
+
+    assert result.display(**display_options) == expected.display(
+        **display_options
+    )
+    assert folded.display(**display_options) == fold_group_tournament_events(
+        sequential.iter_events(random.Random(5))
+    ).display(**display_options)
+    assert parallel_ratings.elo_overlay == sequential_ratings.elo_overlay
@@ -0,0 +1,32 @@
+import random
+
+from conftest import create_league
+from instrumentation import COUNTED_CALLS, instrument
+from random_stream import RandomStream
+
+
+def test_streams_are_counted_only_while_instrumented() -> None:
+    idle = RandomStream(random.Random(1))
+
+    with instrument() as instrumentation:
+        during = RandomStream(random.Random(2))
+        idle.random()
+        during.random()
+        during.random()
+
+    during.random()
+
+    assert idle not in COUNTED_CALLS
+    assert instrumentation.report.counters == {"random_draws": 2}
+    assert during.random == during.generator.random
+
+
+def test_instrumented_runs_count_a_supplied_stream() -> None:
+    league = create_league(4)
+    stream = RandomStream(random.Random(1))
+    _, report = league.simulate_instrumented(stream)
+    _, expected = league.simulate_instrumented(random.Random(1))
+
+    assert report.counters["random_draws"] > 0
+    assert report.counters == expected.counters
+    assert stream.random == stream.generator.random
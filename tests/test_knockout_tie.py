@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch_bracket import BatchBracket
+from conftest import create_teams
+from knockout_tie import KnockoutTie, KnockoutTieConfig
+from match import MatchConfig
+from odds import get_tie_chance
+from random_stream import RandomStream
+from rating_state import RatingState
+
+TIES = 4000
+MATCH_CONFIG = MatchConfig(home_advantage=0, dynamic_elo=False)
+
+
+@pytest.mark.parametrize("legs", [1, 3])
+def test_odd_leg_ties_ignore_away_goals(legs: int) -> None:
+    team1, team2 = create_teams([1500, 1500])
+    tie_config = KnockoutTieConfig(legs=legs)
+    tie = KnockoutTie(team1, team2, MATCH_CONFIG, tie_config)
+    stream = RandomStream(random.Random(1))
+    scoring_draw_wins = [0, 0]
+
+    for _ in range(TIES):
+        winner, _, team1_goals, team2_goals = tie.play(stream, RatingState())
+
+        if sum(team1_goals) == sum(team2_goals) > 0:
+            scoring_draw_wins[winner == team2] += 1
+
+    assert sum(scoring_draw_wins) > 200
+    assert scoring_draw_wins[0] / sum(scoring_draw_wins) == pytest.approx(
+        0.5, abs=0.08
+    )
+
+
+@pytest.mark.parametrize("legs", [1, 3])
+def test_batch_odd_leg_ties_ignore_away_goals(legs: int) -> None:
+    bracket = BatchBracket(
+        create_teams([1500, 1500]),
+        match_config=MATCH_CONFIG,
+        tie_config=KnockoutTieConfig(legs=legs)
+    )
+    team1_won, team1_goals, team2_goals = bracket.play_ties(
+        np.zeros(TIES, dtype=np.int64),
+        np.ones(TIES, dtype=np.int64),
+        np.array([1500.0, 1500.0]),
+        np.random.default_rng(1)
+    )
+    scoring_draws = (
+        (team1_goals.sum(axis=0) == team2_goals.sum(axis=0))
+        & (team1_goals.sum(axis=0) > 0)
+    )
+
+    assert scoring_draws.sum() > 200
+    assert team1_won[scoring_draws].mean() == pytest.approx(0.5, abs=0.08)
+
+
+@pytest.mark.parametrize("legs", [1, 3])
+def test_exact_odd_leg_ties_ignore_away_goals(legs: int) -> None:
+    assert get_tie_chance(
+        1500, 1500, MATCH_CONFIG, KnockoutTieConfig(legs=legs)
+    ) == pytest.approx(0.5)
+
+
+def test_even_leg_ties_use_away_goals() -> None:
+    match_config = MatchConfig(dynamic_elo=False)
+    with_rule = get_tie_chance(1600, 1500, match_config, KnockoutTieConfig())
+    without_rule = get_tie_chance(
+        1600, 1500, match_config, KnockoutTieConfig(away_rule=False)
+    )
+
+    assert with_rule != pytest.approx(without_rule)
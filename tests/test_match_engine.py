@@ -0,0 +1,29 @@
+import pytest
+
+from conftest import (
+    MIN_P_VALUE, get_outcome_counts, get_p_value, sample_scores
+)
+from match import MatchEngine
+
+ELO_GAPS = (0, 150, 400)
+
+
+@pytest.mark.parametrize("elo_gap", ELO_GAPS)
+def test_binomial_matches_per_second_distribution(elo_gap: float) -> None:
+    binomial_scores = sample_scores(MatchEngine.BINOMIAL, elo_gap, 1)
+    per_second_scores = sample_scores(MatchEngine.PER_SECOND, elo_gap, 2)
+
+    assert get_p_value(binomial_scores, per_second_scores) > MIN_P_VALUE
+    assert get_p_value(
+        get_outcome_counts(binomial_scores),
+        get_outcome_counts(per_second_scores)
+    ) > MIN_P_VALUE
+
+
+def test_p_value_rejects_shifted_distribution() -> None:
+    even_scores = sample_scores(MatchEngine.BINOMIAL, 0, 1)
+    uneven_scores = sample_scores(MatchEngine.BINOMIAL, 400, 2)
+
+    assert get_p_value(
+        get_outcome_counts(even_scores), get_outcome_counts(uneven_scores)
+    ) < MIN_P_VALUE
@@ -0,0 +1,154 @@
+import dataclasses
+import random
+
+import pytest
+
+from batch_bracket import BatchBracket
+from bracket import Bracket, BracketConfig
+from bracket_odds import solve_bracket
+from checkpoint import simulate_monte_carlo
+from conftest import create_league, create_teams
+from group_tournament import GroupConfig, GroupTournament
+from match import MatchConfig
+from monte_carlo import (
+    AdaptiveMonteCarlo, AdaptiveMonteCarloConfig, MonteCarlo, MonteCarloConfig,
+    get_team_outcomes
+)
+from rating_state import RatingState
+from renderer import TableFormat
+from result_store import simulate_to_store
+from seasons import Seasons
+from simulation import Retention, Simulation, SimulationResult
+from sweep import Sweep, SweepConfig, build_sweep_grid
+
+
+def create_simulations() -> list[Simulation]:
+    elos = [1500 + 50 * i for i in range(8)]
+    return [
+        create_league(4),
+        Bracket(create_teams(elos)),
+        BatchBracket(create_teams(elos)),
+        GroupTournament(
+            create_teams(elos), group_config=GroupConfig(4, 2)
+        )
+    ]
+
+
+@pytest.mark.parametrize("simulation", create_simulations())
+def test_outcomes_need_standings(simulation: Simulation) -> None:
+    simulation = dataclasses.replace(simulation, retention=Retention.WINNER)
+
+    with pytest.raises(ValueError, match="holds no standings"):
+        get_team_outcomes(simulation.simulate(random.Random(1)))
+
+
+@pytest.mark.parametrize("simulation", create_simulations())
+def test_outcomes_follow_the_winner(simulation: Simulation) -> None:
+    simulation = dataclasses.replace(
+        simulation, retention=Retention.STANDINGS
+    )
+    result = simulation.simulate(random.Random(1))
+    outcomes = get_team_outcomes(result)
+    winner_outcome = outcomes[result.winner.name]
+
+    assert len(outcomes) == len(simulation.get_teams())
+    assert [outcome.won for outcome in outcomes.values()].count(True) == 1
+    assert winner_outcome.won
+    assert winner_outcome.stage == max(
+        outcome.stage for outcome in outcomes.values()
+    )
+
+
+@pytest.mark.parametrize("simulate", [
+    lambda simulation, _: MonteCarlo(simulation, MonteCarloConfig(
+        runs=10, workers=1, retention=Retention.WINNER
+    )).simulate(),
+    lambda simulation, _: AdaptiveMonteCarlo(
+        simulation,
+        AdaptiveMonteCarloConfig(workers=1, retention=Retention.WINNER)
+    ).simulate(),
+    lambda simulation, _: Sweep(simulation, sweep_config=SweepConfig(
+        workers=1, retention=Retention.WINNER
+    )).simulate(),
+    lambda simulation, path: simulate_monte_carlo(MonteCarlo(
+        simulation, MonteCarloConfig(workers=1, retention=Retention.WINNER)
+    ), path),
+    lambda simulation, path: simulate_to_store(
+        simulation, path, 10, workers=1, retention=Retention.WINNER
+    )
+])
+def test_drivers_reject_winner_retention(simulate, tmp_path) -> None:
+    with pytest.raises(ValueError, match="need standings"):
+        simulate(create_league(4), str(tmp_path / "store"))
+
+
+def get_fields(result: SimulationResult) -> dict:
+    return {
+        name: value for name, value in vars(result).items()
+        if name != "seconds"
+    }
+
+
+@pytest.mark.parametrize("create_driver", [
+    lambda simulation, seed: MonteCarlo(
+        simulation, MonteCarloConfig(runs=40, workers=1, seed=seed)
+    ),
+    lambda simulation, seed: AdaptiveMonteCarlo(
+        simulation,
+        AdaptiveMonteCarloConfig(
+            batch_runs=40, max_runs=40, workers=1, seed=seed
+        )
+    ),
+    lambda simulation, seed: Sweep(
+        simulation,
+        build_sweep_grid({"home_advantage": [0, 100]}),
+        SweepConfig(runs=40, workers=1, seed=seed)
+    )
+])
+def test_drivers_seed_runs_from_a_supplied_rng(create_driver) -> None:
+    league = create_league(4)
+    seed = random.Random(7).getrandbits(64)
+    result = create_driver(league, 0).simulate(random.Random(7))
+    expected = create_driver(league, seed).simulate()
+
+    instrumented, _ = create_driver(league, 0).simulate_instrumented(
+        random.Random(7)
+    )
+
+    assert get_fields(result) == get_fields(expected)
+    assert get_fields(instrumented) == get_fields(expected)
+
+
+def test_monte_carlo_starts_runs_from_supplied_ratings() -> None:
+    league = create_league(4)
+    weakest = league.teams[0]
+    ratings = RatingState({weakest: 2500})
+    monte_carlo = MonteCarlo(league, MonteCarloConfig(runs=100, workers=1))
+    boosted = monte_carlo.simulate(ratings=ratings)
+
+    assert ratings.elo_overlay == {weakest: 2500}
+    assert boosted.aggregates[weakest.name].win_chance > 0.8
+    assert monte_carlo.simulate().aggregates[weakest.name].win_chance < 0.5
+
+
+@pytest.mark.parametrize("create_result", [
+    lambda: MonteCarlo(
+        create_league(4), MonteCarloConfig(runs=20, workers=1)
+    ).simulate(),
+    lambda: AdaptiveMonteCarlo(create_league(4), AdaptiveMonteCarloConfig(
+        batch_runs=20, max_runs=20, workers=1
+    )).simulate(),
+    lambda: Seasons(create_league(4), 3).simulate(random.Random(1)),
+    lambda: solve_bracket(Bracket(
+        create_teams([1500, 1600, 1700, 1800]),
+        match_config=MatchConfig(dynamic_elo=False),
+        bracket_config=BracketConfig(shuffle_teams=False)
+    ))
+])
+def test_results_render_plain_tables(create_result) -> None:
+    result = create_result()
+    plain = result.display(table_format=TableFormat.PLAIN)
+
+    assert "│" in result.display()
+    assert "│" not in plain
+    assert "Team" in plain
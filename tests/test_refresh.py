@@ -0,0 +1,131 @@
+import pytest
+
+import main
+from conftest import get_rows
+from main import refresh_team_file
+from reader import read_teams_from_csv
+from scraper import ScraperConfig, refresh_teams
+from team import Team, TeamTable
+
+REGION_PATHS = ("/", "/ENG", "/ESP", "/GER")
+
+
+def replace_elo(teams: list[Team], name: str, elo: float) -> list[Team]:
+    table = TeamTable()
+    return [
+        table.add_team(
+            team.name,
+            team.region,
+            elo if team.name == name else team.elo,
+            team.regional_league_rank
+        )
+        for team in teams
+    ]
+
+
+def update_liverpool(fixture_server) -> None:
+    fixture_server.update_page(
+        "/ENG", fixture_server.pages["/ENG"].replace(b"2050", b"2075")
+    )
+
+
+def create_config(fixture_server, tmp_path, **options) -> ScraperConfig:
+    return ScraperConfig(
+        base_url=fixture_server.base_url,
+        cache_dir=str(tmp_path / "http_cache"),
+        **options
+    )
+
+
+def test_unchanged_pages_revalidate_with_etags(
+        fixture_server, tmp_path
+) -> None:
+    config = create_config(fixture_server, tmp_path)
+    first = refresh_teams([], config)
+    second = refresh_teams(first.teams, config, first.region_digests)
+
+    assert second.changed_regions == []
+    assert get_rows(second.teams) == get_rows(first.teams)
+
+    for path in REGION_PATHS:
+        assert fixture_server.get_statuses(path) == [200, 304]
+
+
+def test_unchanged_pages_revalidate_with_last_modified(
+        fixture_server, tmp_path
+) -> None:
+    fixture_server.send_etags = False
+    config = create_config(fixture_server, tmp_path)
+    first = refresh_teams([], config)
+    second = refresh_teams(first.teams, config, first.region_digests)
+
+    assert second.changed_regions == []
+
+    for path in REGION_PATHS:
+        assert fixture_server.get_statuses(path) == [200, 304]
+
+
+def test_only_changed_regions_are_parsed(fixture_server, tmp_path) -> None:
+    config = create_config(fixture_server, tmp_path)
+    first = refresh_teams([], config)
+
+    update_liverpool(fixture_server)
+    second = refresh_teams(first.teams, config, first.region_digests)
+
+    assert second.changed_regions == ["England"]
+    assert get_rows(second.teams) == get_rows(
+        replace_elo(first.teams, "Liverpool", 2075)
+    )
+    assert fixture_server.get_statuses("/ENG") == [200, 200]
+    assert fixture_server.get_statuses("/ESP") == [200, 304]
+
+
+def test_edited_rows_are_parsed_again(fixture_server, tmp_path) -> None:
+    config = create_config(fixture_server, tmp_path)
+    first = refresh_teams([], config)
+    stored_teams = replace_elo(first.teams, "Barcelona", 1234)
+    second = refresh_teams(stored_teams, config, first.region_digests)
+
+    assert second.changed_regions == ["Spain"]
+    assert get_rows(second.teams) == get_rows(first.teams)
+    assert fixture_server.get_statuses("/ESP") == [200, 304]
+
+
+def test_interrupted_refresh_is_picked_up_later(
+        fixture_server, tmp_path, monkeypatch
+) -> None:
+    team_path = str(tmp_path / "teams.csv")
+    config = create_config(fixture_server, tmp_path)
+    first = refresh_team_file(team_path, config)
+    update_liverpool(fixture_server)
+
+    def crash(*_) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(main, "write_teams_to_csv", crash)
+
+    with pytest.raises(OSError):
+        refresh_team_file(team_path, config)
+
+    monkeypatch.undo()
+    expected = get_rows(replace_elo(first, "Liverpool", 2075))
+
+    assert get_rows(refresh_team_file(team_path, config)) == expected
+    assert get_rows(read_teams_from_csv(team_path, False)) == expected
+    assert fixture_server.get_statuses("/ENG") == [200, 200, 304]
+
+
+def test_forced_refresh_refetches_every_page(
+        fixture_server, tmp_path
+) -> None:
+    first = refresh_teams([], create_config(fixture_server, tmp_path))
+    stored_teams = replace_elo(first.teams, "Barcelona", 1234)
+    forced = refresh_teams(stored_teams, create_config(
+        fixture_server, tmp_path, force_refresh=True
+    ))
+
+    assert forced.changed_regions == ["England", "Spain", "Germany"]
+    assert get_rows(forced.teams) == get_rows(first.teams)
+
+    for path in REGION_PATHS:
+        assert fixture_server.get_statuses(path) == [200, 200]
@@ -0,0 +1,97 @@
+import gc
+import os
+import pickle
+
+import pytest
+
+from conftest import create_league, write_teams_csv
+from league import League
+from monte_carlo import (
+    AdaptiveMonteCarlo, AdaptiveMonteCarloConfig, MonteCarlo, MonteCarloConfig
+)
+from reader import read_teams_from_csv
+from result_cache import ResultCache, get_cache_key
+from sweep import Sweep, SweepConfig, build_sweep_grid
+from team import Team
+
+TEAM_ROWS = [
+    ("Alpha", 1900), ("Bravo", 1500), ("Charlie", 1700),
+    ("Delta", 1600), ("Echo", 1800), ("Foxtrot", 1400)
+]
+
+
+def read_sorted_teams(csv_path: str) -> list[Team]:
+    read_teams_from_csv(csv_path)
+    teams = read_teams_from_csv(csv_path)
+    teams.sort(key=lambda team: team.elo, reverse=True)
+    return teams
+
+
+def test_cached_results_follow_reordered_team_rows(tmp_path) -> None:
+    csv_path = str(tmp_path / "teams.csv")
+    cache = ResultCache(str(tmp_path / "results"))
+
+    write_teams_csv(csv_path, TEAM_ROWS)
+    result = cache.simulate(League(read_sorted_teams(csv_path)), seed=1)
+    expected = result.display(show_matches=True)
+    winner = result.winner.name
+    del result
+    gc.collect()
+
+    write_teams_csv(csv_path, TEAM_ROWS[::-1])
+    teams = read_sorted_teams(csv_path)
+    cached = cache.simulate(League(teams), seed=1)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cached.display(show_matches=True) == expected
+    assert cached.winner.name == winner
+    assert any(cached.winner is team for team in teams)
+
+
+def test_unreadable_entries_are_misses(tmp_path) -> None:
+    csv_path = str(tmp_path / "teams.csv")
+    cache = ResultCache(str(tmp_path / "results"))
+
+    write_teams_csv(csv_path, TEAM_ROWS)
+    league = League(read_sorted_teams(csv_path))
+    path = cache.get_path(get_cache_key(league, 1))
+
+    with open(path, "wb") as result_file:
+        result_file.write(pickle.dumps([1, 2])[:-3])
+
+    assert cache.load(get_cache_key(league, 1), league.teams) is None
+    assert not os.path.exists(path)
+
+    cache.simulate(league, seed=1)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+@pytest.mark.parametrize("seed", [None, 1])
+@pytest.mark.parametrize("create_driver", [
+    lambda league: MonteCarlo(league, MonteCarloConfig(runs=20, workers=1)),
+    lambda league: AdaptiveMonteCarlo(league, AdaptiveMonteCarloConfig(
+        batch_runs=20, max_runs=20, workers=1
+    )),
+    lambda league: Sweep(
+        league,
+        build_sweep_grid({"home_advantage": [0, 100]}),
+        SweepConfig(runs=20, workers=1)
+    )
+])
+def test_seeded_drivers_are_cached(tmp_path, create_driver, seed) -> None:
+    cache = ResultCache(str(tmp_path / "results"))
+    driver = create_driver(create_league(4))
+    result = cache.simulate(driver, seed)
+
+    assert cache.simulate(driver, seed).display() == result.display()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_time_budgeted_runs_are_not_cached(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path / "results"))
+    driver = AdaptiveMonteCarlo(create_league(4), AdaptiveMonteCarloConfig(
+        time_budget=1, workers=1
+    ))
+
+    with pytest.raises(ValueError, match="not reproducible"):
+        cache.simulate(driver)
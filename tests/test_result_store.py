@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from batch_bracket import BatchBracket
+from bracket import Bracket
+from conftest import create_league, create_teams
+from group_tournament import GroupConfig, GroupTournament
+from league import League
+from result_store import simulate_to_store
+from simulation import Retention, Simulation
+from team import Team
+
+
+def test_resumed_store_matches_a_single_run(tmp_path) -> None:
+    league = create_league(4)
+    resumed_path = str(tmp_path / "resumed")
+    single_path = str(tmp_path / "single")
+
+    simulate_to_store(league, resumed_path, 20, seed=3, workers=1)
+    resumed = simulate_to_store(league, resumed_path, 40, seed=3, workers=1)
+    single = simulate_to_store(league, single_path, 40, seed=3, workers=1)
+
+    assert len(resumed) == len(single) == 40 * 4
+    assert (resumed.seed, resumed.retention) == (3, Retention.STANDINGS)
+
+    for name in single.columns:
+        assert np.array_equal(resumed[name], single[name])
+
+
+@pytest.mark.parametrize("options", [
+    {"seed": 4},
+    {"retention": Retention.FULL},
+    {"simulation": League(
+        [Team(f"Team {i}", "Test", 1500, 1) for i in range(4)]
+    )}
+])
+def test_store_refuses_another_experiment(tmp_path, options: dict) -> None:
+    path = str(tmp_path / "store")
+    simulate_to_store(create_league(4), path, 20, seed=3, workers=1)
+
+    simulation = options.pop("simulation", create_league(4))
+    resume_options = {"seed": 3, "workers": 1, **options}
+
+    with pytest.raises(ValueError, match="another experiment"):
+        simulate_to_store(simulation, path, 40, **resume_options)
+
+
+@pytest.mark.parametrize("simulation", [
+    Bracket(create_teams([1500 + 50 * i for i in range(6)])),
+    BatchBracket(create_teams([1500 + 50 * i for i in range(6)])),
+    GroupTournament(
+        create_teams([1500 + 50 * i for i in range(8)]),
+        group_config=GroupConfig(4, 2)
+    )
+])
+def test_goals_do_not_depend_on_retention(
+        tmp_path, simulation: Simulation
+) -> None:
+    standings = simulate_to_store(
+        simulation, str(tmp_path / "standings"), 20, workers=1
+    )
+    full = simulate_to_store(
+        simulation, str(tmp_path / "full"), 20, workers=1,
+        retention=Retention.FULL
+    )
+
+    assert standings["goals_for"].sum() > 0
+    assert standings["goals_for"].sum() == standings["goals_against"].sum()
+
+    for name in ("goals_for", "goals_against"):
+        assert np.array_equal(standings[name], full[name])
@@ -0,0 +1,49 @@
+import pytest
+import requests
+
+from conftest import get_rows
+from scraper import ScraperConfig, scrape_teams_from_web
+
+EXPECTED_TEAMS = [
+    ("Liverpool", "England", 2050, 1),
+    ("ManCity", "England", 2030, 1),
+    ("Leeds", "England", 1700, 2),
+    ("RealMadrid", "Spain", 1990, 1),
+    ("Barcelona", "Spain", 1950, 1),
+    ("Bayern", "Germany", 1960, 1),
+    ("Leverkusen", "Germany", 1900, 1)
+]
+
+
+def test_parallel_scrape_keeps_page_order(fixture_server) -> None:
+    fixture_server.gather_paths = {"/ENG", "/ESP", "/GER"}
+    fixture_server.delays["/ENG"] = 0.2
+
+    teams = scrape_teams_from_web(
+        ScraperConfig(base_url=fixture_server.base_url, workers=3)
+    )
+
+    assert get_rows(teams) == EXPECTED_TEAMS
+    assert fixture_server.peak_in_flight == 3
+
+
+def test_scraper_retries_server_errors(fixture_server) -> None:
+    fixture_server.failures["/ESP"] = 2
+
+    teams = scrape_teams_from_web(ScraperConfig(
+        base_url=fixture_server.base_url, retries=3, backoff_factor=0
+    ))
+
+    assert get_rows(teams) == EXPECTED_TEAMS
+    assert fixture_server.get_statuses("/ESP") == [503, 503, 200]
+
+
+def test_scraper_gives_up_after_retries(fixture_server) -> None:
+    fixture_server.failures["/GER"] = 5
+
+    with pytest.raises(requests.exceptions.RetryError):
+        scrape_teams_from_web(ScraperConfig(
+            base_url=fixture_server.base_url, retries=2, backoff_factor=0
+        ))
+
+    assert fixture_server.get_statuses("/GER") == [503, 503, 503]
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from match import MatchConfig, MatchEngine, play_match
+from rating_state import RatingState
+from score_distribution import get_quantized_match_odds
+from team import Team
+
+MATCHES = 20000
+
+
+def get_outcome(home_goals: int, away_goals: int) -> int:
+    return (home_goals > away_goals) - (home_goals < away_goals)
+
+
+def get_outcome_chances(match_config: MatchConfig, elo_diff: float) -> list:
+    match_odds = get_quantized_match_odds(
+        elo_diff,
+        match_config.elo_weight,
+        match_config.goals_per_game,
+        match_config.match_minutes
+    )
+    return [match_odds.away_win, match_odds.draw, match_odds.home_win]
+
+
+@pytest.mark.parametrize("home_elo, home_advantage, other_advantage", [
+    (1500, 60, 100),
+    (1500, 0, 20),
+    (1700, 60, 0)
+])
+def test_lookup_engine_couples_outcomes_across_configs(
+        home_elo: float, home_advantage: float, other_advantage: float
+) -> None:
+    home_team = Team("Home", "Test", home_elo, 0)
+    away_team = Team("Away", "Test", 1500, 0)
+    match_config = MatchConfig(
+        home_advantage=home_advantage,
+        dynamic_elo=False,
+        engine=MatchEngine.LOOKUP
+    )
+    other_config = MatchConfig(
+        home_advantage=other_advantage,
+        dynamic_elo=False,
+        engine=MatchEngine.LOOKUP
+    )
+    rng = random.Random(7)
+    ratings = RatingState()
+    flips = 0
+
+    for _ in range(MATCHES):
+        uniform = rng.random()
+        home_goals, away_goals, _ = play_match(
+            home_team, away_team, match_config, lambda: uniform, ratings
+        )
+        other_home_goals, other_away_goals, _ = play_match(
+            home_team, away_team, other_config, lambda: uniform, ratings
+        )
+        flips += get_outcome(home_goals, away_goals) != get_outcome(
+            other_home_goals, other_away_goals
+        )
+
+    chances = get_outcome_chances(
+        match_config, 1500 - home_elo - home_advantage
+    )
+    other_chances = get_outcome_chances(
+        other_config, 1500 - home_elo - other_advantage
+    )
+    total_variation = sum(
+        abs(chance - other_chance)
+        for chance, other_chance in zip(chances, other_chances)
+    ) / 2
+    tolerance = 4 * (total_variation / MATCHES) ** 0.5
+
+    assert total_variation > 0.01
+    assert flips / MATCHES <= 2 * total_variation + tolerance
@@ -0,0 +1,69 @@
+import gc
+import pickle
+
+import pytest
+
+from conftest import write_teams_csv
+from rating_state import RatingState
+from reader import get_snapshot_path, read_teams_from_csv
+from team import TEAM_TABLES, Team, TeamTable
+
+
+def test_teams_compare_by_name_and_region() -> None:
+    team = Team("A", "X", 1500, 1)
+
+    assert team == Team("A", "X", 1600, 2)
+    assert hash(team) == hash(Team("A", "X", 1600, 2))
+    assert team != Team("A", "Y", 1500, 1)
+    assert team != "A"
+    assert pickle.loads(pickle.dumps(team)) == team
+
+
+def test_ratings_follow_team_equality() -> None:
+    team = Team("A", "X", 1500, 1)
+    ratings = RatingState({team: 1600})
+    ratings.add_elo(Team("A", "X", 1400, 2), 10)
+
+    assert ratings.get_elo(team) == 1610
+    assert ratings.get_elo(Team("A", "Y", 1500, 1)) == 1500
+    assert pickle.loads(pickle.dumps(ratings)).elo_overlay == {team: 1610}
+
+
+def test_ad_hoc_teams_do_not_share_a_table() -> None:
+    table = TeamTable()
+    table_team = Team("A", "X", 1500, 1, table=table)
+
+    assert table_team.table is table
+    assert Team("A", "X", 1500, 1).table is not Team("B", "X", 1500, 1).table
+
+    gc.collect()
+    table_count = len(TEAM_TABLES)
+
+    for i in range(100):
+        Team(f"Team {i}", "X", 1500, 1)
+
+    gc.collect()
+    assert len(TEAM_TABLES) == table_count
+
+
+def test_pickled_snapshot_teams_detect_changed_rows(tmp_path) -> None:
+    csv_path = str(tmp_path / "teams.csv")
+    write_teams_csv(csv_path, [("Alpha", 1800), ("Bravo", 1500)])
+    read_teams_from_csv(csv_path)
+    teams = read_teams_from_csv(csv_path)
+
+    assert teams[0].table.snapshot_path == get_snapshot_path(csv_path)
+
+    pickled = pickle.dumps(teams)
+    del teams
+    gc.collect()
+
+    assert [team.name for team in pickle.loads(pickled)] == ["Alpha", "Bravo"]
+    gc.collect()
+
+    write_teams_csv(csv_path, [("Bravo", 1500), ("Alpha", 1800)])
+    read_teams_from_csv(csv_path)
+    gc.collect()
+
+    with pytest.raises(ValueError, match="changed since pickling"):
+        pickle.loads(pickled)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 from team import Team
 
@@ -20,3 +20,29 @@ def get_win_data_from_goals(
         return OptionalWinData(team2, team1)
 
     return OptionalWinData(None, None)
+
+
+def sample_binomial(
+        trials: int, chance: float, uniform: Callable[[], float]
+) -> int:
+    if trials <= 0 or chance <= 0:
+        return 0
+
+    if chance >= 1:
+        return trials
+
+    if trials < 16:
+        return sum(1 for _ in range(trials) if chance > uniform())
+
+    odds = chance / (1 - chance)
+    probability = (1 - chance) ** trials
+    cumulative = probability
+    target = uniform()
+    successes = 0
+
+    while target >= cumulative and successes < trials:
+        probability *= odds * (trials - successes) / (successes + 1)
+        successes += 1
+        cumulative += probability
+
+    return successes
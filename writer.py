@@ -1,5 +1,8 @@
+import json
 from csv import DictWriter
 
+from reader import get_region_digest_path
+from response_cache import write_atomically
 from team import Team
 
 
@@ -17,3 +20,9 @@ def write_teams_to_csv(csv_path: str, teams: list[Team]) -> None:
                 "Elo": team.elo,
                 "Regional League Rank": team.regional_league_rank
             })
+
+
+def write_region_digests(csv_path: str, region_digests: dict[str, str]) -> None:
+    write_atomically(
+        get_region_digest_path(csv_path), json.dumps(region_digests).encode()
+    )